@@ -1,893 +1,1667 @@
-"""ChimeraCat: Intelligent code concatenator and summarizer for LLM analysis.
-
-Analyzes Python codebases to generate consolidated files optimized for LLM processing,
-with configurable summarization to reduce token usage while preserving key information.
-
-Args:
-    src_dir (str): Source directory containing Python files (default: "src")
-    summary_level (SummaryLevel): Summarization level (INTERFACE/CORE/NONE)
-    exclude_patterns (List[str]): Patterns to exclude from processing
-    rules (Optional[SummaryRules]): Custom summarization rules
-    elide_disconnected_deps (bool): Omit disconnected modules from visualization
-    generate_report (Optional[bool]): Include dependency analysis report
-    report_only (bool): Generate only the dependency report
-    use_numeric (bool): Use numeric instead of alpha labels in visualizations
-    debug (bool): Enable debug output
-    debug_str (str): Prefix for debug messages
-
-Key Features:
-    - Analyzes Python files for imports and definitions
-    - Builds dependency graphs using NetworkX
-    - Generates both .py files and Colab notebooks
-    - Smart handling of internal/external imports
-    - Configurable code summarization
-
-Configuration Details:
-    src_dir: Source directory to analyze. Defaults to "./src" in cwd.
-    
-    summary_level: Controls summarization aggressiveness:
-        - NONE: Full code output
-        - INTERFACE: Preserve signatures/types/docstrings only
-        - CORE: Include core logic, skip standard patterns
-    
-    exclude_patterns: Files matching these patterns are skipped.
-        Note: ChimeraCat always excludes itself to avoid recursion.
-    
-    rules: Override default summarization rules with custom SummaryRules.
-        Useful for domain-specific boilerplate detection.
-    
-    elide_disconnected_deps: When True, omit modules with no dependencies
-        from visualization. Useful for cleaner dependency graphs.
-    
-    generate_report: Controls inclusion of dependency analysis.
-        Defaults to True for INTERFACE/CORE summaries.
-    
-    report_only: Generate only dependency report without code output.
-    
-    use_numeric: Use numbers instead of letters for node labels.
-
-Example:
-    ```python
-    # Generate both notebook and summarized Python file
-    cat = ChimeraCat(
-        "src",
-        summary_level=SummaryLevel.INTERFACE,
-        exclude_patterns=["tests"],
-        elide_disconnected_deps=True
-    )
-    notebook = cat.generate_colab_notebook()
-    py_file = cat.generate_concat_file()
-    ```
-"""
-
-import re
-from pathlib import Path
-import networkx as nx
-
-from enum import Enum
-from typing import Dict, List, Set, Optional, Pattern
-from dataclasses import dataclass, field
-from datetime import datetime
-from phart import ASCIIRenderer, LayoutOptions, NodeStyle    
-from . import __version__
-
-import argparse
-import sys
-
-class SummaryLevel(Enum):
-    INTERFACE = "interface"     # Just interfaces/types/docstrings
-    CORE = "core"              # + Core logic, skip standard patterns
-    NONE = "none"      # Full code
-
-@dataclass
-class SummaryPattern:
-    """Pattern for code summarization with explanation"""
-    pattern: str
-    replacement: str
-    explanation: str
-    flags: re.RegexFlag = re.MULTILINE
-
-    def apply(self, content: str) -> str:
-        return re.sub(self.pattern, f"{self.replacement} # {self.explanation}\n", 
-                     content, flags=self.flags)
-
-@dataclass
-class SummaryRules:
-    """Collection of patterns for different summary levels"""
-    interface: List[SummaryPattern] = field(default_factory=list)
-    core: List[SummaryPattern] = field(default_factory=list)
-
-    @classmethod
-    def default_rules(cls) -> 'SummaryRules':
-        return cls(
-            interface=[
-                SummaryPattern(
-                    pattern=r'(class\s+\w+(?:\([^)]*\))?):(?:\s*"""[^"]*""")?[^\n]*(?:\n(?!class|def)[^\n]*)*',
-                    replacement=r'\1:\n    ... # ',
-                    explanation="Class interface preserved",
-                    flags=re.MULTILINE
-                ),
-                SummaryPattern(
-                    pattern=r'(def\s+\w+\s*\([^)]*\)):(?:\s*"""[^"]*""")?[^\n]*(?:\n(?!class|def)[^\n]*)*',
-                    replacement=r'\1:\n    ... # ',
-                    explanation="Function signature preserved",
-                    flags=re.MULTILINE
-                )
-            ],
-            core=[
-                SummaryPattern(
-                    pattern=r'(def\s+get_\w+\([^)]*\)):\s*return[^\n]*\n',
-                    replacement=r'\1:\n    ... # ',
-                    explanation="Getter method summarized"
-                ),
-                SummaryPattern(
-                    pattern=r'(def\s*__init__\s*\([^)]*\)):[^\n]*(?:\n(?!def|class)[^\n]*)*',
-                    replacement=r'\1:\n    ... # ',
-                    explanation="Standard initialization summarized"
-                )
-            ]
-        ) 
-@dataclass
-class ModuleInfo:
-    """Information about a Python module"""
-    path: Path
-    content: str
-    imports: Set[str]
-    classes: Set[str]
-    functions: Set[str]
-
-class ChimeraCat:
-    """Utility to concatenate modular code into Colab-friendly single files"""
-    def __init__(self, 
-             src_dir: str = "src", 
-             summary_level: SummaryLevel = SummaryLevel.NONE,
-             exclude_patterns: List[str] = None,
-             rules: Optional[SummaryRules] = None,
-             elide_disconnected_deps: bool = False,
-             generate_report: Optional[bool] = None,
-             report_only: bool = False,
-             use_numeric: bool = False,
-             debug: bool = False,
-             debug_str = ""):
-
-        self.src_dir = Path(src_dir)
-        self.summary_level = summary_level
-        self.report_only = report_only
-        self.use_numeric = use_numeric
-        self.rules = rules or SummaryRules.default_rules()
-        self.modules: Dict[Path, ModuleInfo] = {}
-        self.dep_graph = nx.DiGraph()
-        self.self_path = Path(__file__).resolve()
-        self.exclude_patterns = exclude_patterns or []
-        self.debug = debug
-        self.elide_disconnected_deps = elide_disconnected_deps
-        self.debug_str = debug_str
-
-        if generate_report is None:
-            self.generate_report = summary_level in (SummaryLevel.INTERFACE, SummaryLevel.CORE)
-        else:
-            self.generate_report = generate_report
-
-    def _debug_print(self, *args, **kwargs):
-        """Helper for debug output"""
-        if self.debug:
-            print(f"{self.debug_str}: {args} {list(kwargs.items())}")
-
-    def should_exclude(self, file_path: Path) -> bool:
-        """Check if a file should be excluded from processing"""
-        # Always exclude self
-        self._debug_print(file_path.resolve(), self.self_path)
-        if file_path.resolve() == self.self_path:
-            if self.debug:
-                self._debug_print(f"excluding self {self.self_path}")
-            return True
-            
-        # Check against exclude patterns
-        str_path = str(file_path)
-        self._debug_print("str_path",str_path)
-        for pattern in self.exclude_patterns:
-            self._debug_print("comparing", pattern, str_path)
-        return any(pattern in str_path for pattern in self.exclude_patterns)
-
-    def analyze_file(self, file_path: Path) -> Optional[ModuleInfo]:
-        """Analyze a Python file for imports and definitions"""
-        if self.should_exclude(file_path):
-            self._debug_print(f'excluding {file_path}')
-            return None
-
-        with open(file_path, 'r') as f:
-            content = f.read()
-            
-        # Find imports
-        import_pattern = r'^(?:from\s+(\S+)\s+)?import\s+([^#\n]+)'
-        imports = set()
-        for match in re.finditer(import_pattern, content, re.MULTILINE):
-            if match.group(1):  # from X import Y
-                imports.add(match.group(1))
-            else:  # import X
-                imports.add(match.group(2).split(',')[0].strip())
-                
-        # Find class definitions
-        class_pattern = r'class\s+(\w+)'
-        classes = set(re.findall(class_pattern, content))
-        
-        # Find function definitions
-        func_pattern = r'def\s+(\w+)'
-        functions = set(re.findall(func_pattern, content))
-        
-        return ModuleInfo(
-            path=file_path,
-            content=content,
-            imports=imports,
-            classes=classes,
-            functions=functions
-        )
-
-    def _summarize_content(self, content: str) -> str:
-        """Apply summary patterns based on current level"""
-        if not isinstance(content, str):
-            raise TypeError(f"Expected string content but got {type(content)}: {content}")
-            
-        if self.summary_level == SummaryLevel.NONE:
-            return content
-            
-        result = content
-        rules = self.rules or SummaryRules.default_rules()
-        
-        # Apply patterns based on level
-        if self.summary_level == SummaryLevel.INTERFACE:
-            for pattern in rules.interface:
-                result = pattern.apply(result)
-        elif self.summary_level == SummaryLevel.CORE:
-            # Apply both interface and core patterns
-            for pattern in rules.interface + rules.core:
-                result = pattern.apply(result)
-                
-        return result
-
-    def _process_imports(self, content: str, module_path: Path) -> str:
-        """Process and adjust imports for concatenated context"""
-        if not isinstance(content, str):
-            raise TypeError(f"Expected string content but got {type(content)}: {content}")
-
-        def replace_relative_import(match: re.Match) -> str:
-            indent = len(match.group()) - len(match.group().lstrip())
-            spaces = ' ' * indent
-            original_line = match.group()
-            return f'{spaces}"""RELATIVE_IMPORT: \n{original_line}\n{spaces}"""'
-        
-        pattern = r'^\s*from\s+\..*$'
-        return re.sub(pattern, replace_relative_import, content, flags=re.MULTILINE)
-
-    def build_dependency_graph(self):
-        """Build a dependency graph with proper relative import resolution"""
-        self._debug_print("\nBuilding dependency graph...")
-        
-        # First pass: Create nodes
-        for file_path in self.src_dir.rglob("*.py"):
-            module_info = self.analyze_file(file_path)
-            if module_info is not None:
-                self.modules[file_path] = module_info
-                self.dep_graph.add_node(file_path)
-                self._debug_print(f"Added node: {file_path.relative_to(self.src_dir)}")
-                if module_info.imports:
-                    self._debug_print(f"  Found imports: {', '.join(module_info.imports)}")
-        
-        # Second pass: Add edges
-        for file_path, module in self.modules.items():
-            current_module = str(file_path.relative_to(self.src_dir)).replace('\\', '/')
-            module_dir = str(file_path.parent.relative_to(self.src_dir)).replace('\\', '/')
-            
-            for imp in module.imports:
-                if imp.startswith('.'):
-                    # Handle relative imports
-                    dots = imp.count('.')
-                    parts = module_dir.split('/')
-                    
-                    # Go up directory tree based on dot count
-                    if dots > len(parts):
-                        continue  # Invalid relative import
-                        
-                    base_path = '/'.join(parts[:-dots] if dots > 0 else parts)
-                    target_module = imp.lstrip('.')
-                    
-                    if target_module:
-                        full_target = f"{base_path}/{target_module.replace('.', '/')}.py"
-                    else:
-                        full_target = f"{base_path}/__init__.py"
-                    
-                    # Find matching module
-                    for other_path in self.modules:
-                        other_rel = str(other_path.relative_to(self.src_dir)).replace('\\', '/')
-                        if other_rel == full_target:
-                            self._debug_print(f"  Adding edge: {other_rel} -> {current_module}")
-                            self.dep_graph.add_edge(file_path, other_path)
-                else:
-                    # Handle absolute imports within our project
-                    potential_path = imp.replace('.', '/') + '.py'
-                    for other_path in self.modules:
-                        other_rel = str(other_path.relative_to(self.src_dir)).replace('\\', '/')
-                        if other_rel.endswith(potential_path):
-                            self._debug_print(f"  Adding edge: {other_rel} -> {current_module}")
-                            self.dep_graph.add_edge(file_path, other_path)
-
-    def generate_concat_file(self, output_file: str = "colab_combined.py") -> str:
-        """Generate a single file combining all modules in dependency order"""
-        self.build_dependency_graph()
-        
-        header = f"""{self._get_header_content()}
-Summary Level: {self.summary_level.value}
-        """
-        
-        # Start with external imports
-        output = [
-            header,
-            '"""',
-            self.generate_dependency_ascii(),
-            "# External imports",'"""',
-            *self._get_external_imports(),
-            "\n# Combined module code\n"
-        ]
-        
-        # Get files in dependency order
-        sorted_files = self._get_sorted_files()
-        
-        # Create a map of original module paths to their contents
-        module_contents = {}
-        
-        # First pass: collect and process all module contents
-        for file_path in sorted_files:
-            if file_path in self.modules:
-                module = self.modules[file_path]
-                rel_path = file_path.relative_to(self.src_dir)
-                
-                # Process imports and summarize content
-                processed_content = self._process_imports(
-                    self._summarize_content(module.content),
-                    file_path
-                )
-                
-                module_contents[file_path] = {
-                    'content': processed_content,
-                    'rel_path': rel_path
-                }
-        
-        # Second pass: output in correct order with headers
-        for file_path in sorted_files:
-            if file_path in module_contents:
-                info = module_contents[file_path]
-                output.extend([
-                    f"\n# From {info['rel_path']}",
-                    info['content']
-                ])
-        
-        with open(output_file, 'w') as f:
-            f.write('\n'.join(output))
-            
-        return output_file
-    
-    def _get_external_imports(self) -> List[str]:
-      """Get sorted list of external imports from all modules"""
-      external_imports = set()
-      for module in self.modules.values():
-          external_imports.update(
-              imp for imp in module.imports 
-              if not any(str(imp).startswith(str(p.relative_to(self.src_dir).parent)) 
-                        for p in self.modules)
-              and not imp.startswith('.')
-          )
-      
-      # Format and sort the import statements
-      return sorted(f"import {imp}" for imp in external_imports)
-
-    def _paths_match(self, path: Path, import_parts: List[str]) -> bool:
-        """Check if a path matches an import statement"""
-        path_parts = list(path.parts)
-        return len(path_parts) == len(import_parts) and \
-               all(p == i for p, i in zip(path_parts, import_parts))
-
-    def _get_sorted_files(self) -> List[Path]:
-        """Get files sorted by dependencies"""
-        try:
-            # Topological sort ensures dependencies come before dependents
-            return list(nx.topological_sort(self.dep_graph))
-
-        except nx.NetworkXUnfeasible as e:
-            # If we detect a cycle, identify and report it
-            cycles = list(nx.simple_cycles(self.dep_graph))
-            self._debug_print("Warning: Circular dependencies detected:")
-            for cycle in cycles:
-                cycle_path = ' -> '.join(p.name for p in cycle)
-                self._debug_print(f"  {cycle_path}")
-            
-            # Fall back to simple ordering but warn user
-            self._debug_print("Using simple ordering instead.")
-            return list(self.modules.keys())
-
-    def visualize_dependencies(self, output_file: str = "dependencies.png"):
-        """Optional: Visualize the dependency graph"""
-        try:
-            import matplotlib.pyplot as plt
-            pos = nx.spring_layout(self.dep_graph)
-            plt.figure(figsize=(12, 8))
-            nx.draw(self.dep_graph, pos, with_labels=True, 
-                   labels={p: p.name for p in self.dep_graph.nodes()},
-                   node_color='lightblue',
-                   node_size=2000,
-                   font_size=8)
-            plt.savefig(output_file)
-            plt.close()
-            return output_file
-        except ImportError:
-            print("matplotlib not available for visualization")
-            return None
-
-    def get_dependency_report(self) -> str:
-        """Generate a detailed dependency report organized in logical sections.
-        
-        Returns a string containing sections in this order:
-        1. Header
-        2. Directory Structure
-        3. Import Summary
-        4. Module Statistics
-        5. PHART Visualization with Legend
-        6. Dependency Chains
-        7. Module Details
-        """
-        # Header section - introduces the report
-        header = ["Dependency Analysis Report", "=" * 25, ""]
-        
-        # Directory tree section - shows file organization
-        directory_structure = [
-            "Directory Structure:",
-            self._get_tree_output(),
-            ""
-        ]
-        
-        # Import summary section - external and internal dependencies
-        import_summary = [
-            "Import Summary:",
-            self._generate_import_summary(),
-            ""
-        ]
-        
-        # Module statistics and graph header
-        statistics = [
-            "Module Statistics:",
-            f"Total modules: {len(self.modules)}",
-            f"Total dependencies: {self.dep_graph.number_of_edges()}",
-            "",
-            "Module Dependencies:",
-            "-------------------",
-            ""
-        ]
-        
-        # PHART visualization - includes the graph and its legend
-        # Note: generate_dependency_ascii() returns a pre-formatted string
-        visualization = [self.generate_dependency_ascii(), ""]
-        
-        # Dependency chains section - shows topological ordering
-        chains = ["Dependency Chains:", "-" * 17]
-        try:
-            sorted_files = list(nx.topological_sort(self.dep_graph))
-            for idx, file in enumerate(sorted_files):
-                deps = list(self.dep_graph.predecessors(file))
-                chains.append(f"{idx+1}. {file.relative_to(self.src_dir)}")
-                if deps:
-                    chains.append(
-                        f" Depends on: {', '.join(str(d.relative_to(self.src_dir)) for d in deps)}"
-                    )
-            chains.append("")
-        except nx.NetworkXUnfeasible:
-            chains.extend([
-                "Warning: Circular dependencies detected!",
-                "Cycles found:",
-                *[f"  {' -> '.join(str(p.relative_to(self.src_dir)) for p in cycle)}"
-                for cycle in nx.simple_cycles(self.dep_graph)],
-                ""
-            ])
-        
-        # Module details section - detailed information about each module
-        details = ["Module Details:", "-" * 13]
-        for path, module in self.modules.items():
-            details.extend([
-                f"\n{path.relative_to(self.src_dir)}:",
-                f"Classes: {', '.join(module.classes) if module.classes else 'None'}",
-                f"Functions: {', '.join(module.functions) if module.functions else 'None'}",
-                f"Imports: {', '.join(module.imports) if module.imports else 'None'}"
-            ])
-        
-        # Combine all sections in the desired order using extend()
-        # This preserves the proper formatting of each section
-        report = []
-        for section in [header, directory_structure, import_summary, statistics, 
-                    visualization, chains, details]:
-            report.extend(section)
-        
-        # Join all lines with newlines to create the final report
-        return '\n'.join(report)
-
-    def _get_header_content(self):
-        return  f"""
-# Generated by ChimeraCat
-#  /\___/\   ChimeraCat
-# ( o   o )  smart code concatenator/summarizer
-# (  =^=  )  ccat {__version__} https://github.com/scottvr/chimeracat
-#  (______)  Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"""
-        
-    def generate_colab_notebook(self, output_file: str = "colab_combined.ipynb"):
-        """Generate a Jupyter notebook with the combined code"""
-        py_file = self.generate_concat_file("temp_combined.py")
-        
-        with open(py_file, 'r') as f:
-            code = f.read()
-        
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S") 
-        notebook = {
-            "cells": [
-                {
-                    "cell_type": "markdown",
-                    "metadata": {},
-                    "source": [
-                        "##Notebook Generated by ChimeraCat\n"
-                    ],
-                },
-                {
-                    "cell_type": "code",
-                    "metadata": {},
-                    "source": code.splitlines(keepends=True),
-                    "execution_count": None,
-                    "outputs": []
-                },
-                {
-                    "cell_type": "markdown",
-                    "metadata": {},
-                    "source": [
-                        "```\n",
-                        f"{self._get_header_content()}".splitlines(keepends=True),
-                        "```\n"
-                    ]
-                }
-
-            ],
-            "metadata": {
-                "kernelspec": {
-                    "display_name": "Python 3",
-                    "language": "python",
-                    "name": "python3"
-                }
-            },
-            "nbformat": 4,
-            "nbformat_minor": 4
-        }
-        
-        import json
-        with open(output_file, 'w') as f:
-            json.dump(notebook, f, indent=2)
-        
-        Path("temp_combined.py").unlink()  # Clean up temporary file
-        return output_file
-    
-    def generate_dependency_ascii(self) -> str:
-        """Generate ASCII representation of dependency graph"""
-        
-        display_graph = nx.DiGraph()
-        
-         # Mapping of short labels to original node names
-        label_mapping = {}
-        label_index = 0
-
-        def get_short_label(index):
-            """Generate a short label (e.g., A, B, ..., AA, AB)."""
-            return str(index + 1) if self.use_numeric else ''.join(chr(65 + i) for i in divmod(index, 26)[1::-1] or [index % 26])
-
-        # Add nodes and edges with relative path names
-        for node in self.dep_graph.nodes():
-            short_label = get_short_label(label_index)
-            label_mapping[short_label] = node
-            display_graph.add_node(short_label)
-            label_index += 1
-        
-        # Add edges using new node names
-        for src, dst in self.dep_graph.edges():
-            src_label = [k for k, v in label_mapping.items() if v == src][0]
-            dst_label = [k for k, v in label_mapping.items() if v == dst][0]
-            display_graph.add_edge(src_label, dst_label)
-        
-        if self.elide_disconnected_deps:
-            self._debug_print("removing disconnected imports (no dependent relationship)")
-            self._debug_print(display_graph)
-            display_graph.remove_nodes_from(list(nx.isolates(display_graph)))
-            self._debug_print(display_graph)
-#TODO: enable phart cli options from ccat command-line
-        options = LayoutOptions(
-            node_style=NodeStyle.SQUARE,
-            node_spacing=4,
-            layer_spacing=3
-        )
-
-        # Generate the legend
-        legend_lines = ["Legend:"]
-        for short_label, original_node in label_mapping.items():
-            legend_lines.append(f"{short_label}: {original_node}")
-        legend = "\n".join(legend_lines)
-
-        renderer = ASCIIRenderer(display_graph, options=options)
-        ascii_art = f"""
-Directory Structure:
---------------------
-{self._get_tree_output()}
-   
-Module Dependencies:
---------------------
-PHART Module Dependency Graph Visualization (see legend below):
-
-{renderer.render()}
-{legend}
-{"(non-dependent modules elided from visualization)" if self.elide_disconnected_deps else "node names detached from the network and printed in isolation are non-connected/likely unused."}
-
-"""
-        return ascii_art
-
-    def _get_tree_output(self) -> str:
-        """Get tree command output"""
-        try:
-            import subprocess
-            result = subprocess.run(
-                ['tree', str(self.src_dir)],
-                capture_output=True,
-                text=True
-            )
-            return result.stdout
-        except FileNotFoundError:
-            # Fallback to simple directory listing if tree not available
-            return '\n'.join(str(p.relative_to(self.src_dir)) 
-                            for p in self.src_dir.rglob('*.py'))
-    
-    def _generate_import_summary(self) -> str:
-        """Generate summary of imports"""
-        external_imports = set()
-        internal_deps = set()
-        
-        for module in self.modules.values():
-            for imp in module.imports:
-                if not imp.startswith('.'):
-                    external_imports.add(imp)
-                else:
-                    internal_deps.add(imp)
-        
-        return f"""
-    External Dependencies:
-    {', '.join(sorted(external_imports))}
-    
-    Internal Dependencies:
-    {', '.join(sorted(internal_deps))}
-    """
-    
-def get_default_filename(summary_level: SummaryLevel, is_notebook: bool = False) -> str:
-    """Get the default base filename based on output type and summary level"""
-    if is_notebook:
-        return "colab_ready"  # Always full code for notebooks
-        
-    summary_level_names = {
-        SummaryLevel.INTERFACE: "signatures_only",
-        SummaryLevel.CORE: "essential_code",
-        SummaryLevel.NONE: "complete_code"
-    }
-    return summary_level_names[summary_level]
-
-def process_cli_args(args: Optional[List[str]] = None) -> dict:
-    """Process command line arguments and return a config dict for ChimeraCat"""
-    parser = create_cli_parser()
-    parsed_args = parser.parse_args(args)
-
-    # Convert summary level string to enum
-    summary_level = getattr(SummaryLevel, parsed_args.summary_level.upper())
-
-    # Build config dict
-    config = {
-        'src_dir': parsed_args.src_dir,
-        'summary_level': summary_level,
-        'exclude_patterns': parsed_args.exclude,
-        'elide_disconnected_deps': parsed_args.elide_disconnected,
-        'generate_report': parsed_args.report,
-        'report_only': parsed_args.report_only,
-        'use_numeric': parsed_args.use_numeric,
-        'debug': parsed_args.debug,
-        'debug_str': parsed_args.debug_prefix if parsed_args.debug else ""
-    }
-
-    return config, parsed_args
-
-def cli_main(args: Optional[List[str]] = None) -> int:
-    """Main CLI entry point for ChimeraCat"""
-    try:
-        config, args = process_cli_args(args)
-        
-        # Create ChimeraCat instance for Python output (with summarization)
-        cat = ChimeraCat(**config)
-        
-        if args.report_only:
-            cat.build_dependency_graph() 
-            print(cat.get_dependency_report())
-
-        else:
-            # Get base filename from argument or generate default
-            base_filename = args.output
-            
-            if args.output_type in ('py', 'both'):
-                py_filename = f"{base_filename or get_default_filename(config['summary_level'])}.py"
-                py_file = cat.generate_concat_file(py_filename)
-                print(f"Generated Python file: {py_file}")
-                
-            if args.output_type in ('ipynb', 'both'):
-                # Create new instance with NONE summary level for notebook
-                notebook_cat = ChimeraCat(
-                    src_dir=config['src_dir'],
-                    exclude_patterns=config['exclude_patterns'],
-                    elide_disconnected_deps=config['elide_disconnected_deps'],
-                    debug=config['debug'],
-                    debug_str=config['debug_str'],
-                    generate_report=config['generate_report'],
-                    summary_level=SummaryLevel.NONE
-                )
-            
-                nb_filename = f"{base_filename or get_default_filename(summary_level=SummaryLevel.NONE, is_notebook=True)}.ipynb"
-                nb_file = notebook_cat.generate_colab_notebook(nb_filename)
-                print(f"Generated Jupyter notebook (complete code): {nb_file}")
-
-        # If debug is enabled, show additional information regardless of report setting
-        if args.debug or args.report:
-            print(cat.get_dependency_report())
-        
-        return 0
-
-    except Exception as e:
-        print(f"Error: {str(e)}", file=sys.stderr)
-        if args.debug:
-            import traceback
-            traceback.print_exc()
-        return 1
-
-def create_cli_parser() -> argparse.ArgumentParser:
-    """Create the command-line argument parser for ChimeraCat"""
-    parser = argparse.ArgumentParser(
-        prog='ccat',
-        description="""
-    ChimeraCat (ccat) - The smart code concatenator
-     /\\___/\\   
-    ( o   o )  Intelligently combines Python source files
-    (  =^=  )  while maintaining dependencies and readability
-     (______)  
-        """,
-        formatter_class=argparse.RawDescriptionHelpFormatter
-    )
-
-    parser.add_argument(
-        'src_dir',
-        type=str,
-        nargs='?',
-        default='src',
-        help='Source directory containing Python files (default: src)'
-    )
-
-    parser.add_argument(
-        '-s', '--summary-level',
-        type=str,
-        choices=['interface', 'core', 'none'],
-        default='none',
-        help='Code summarization level (for .py output only, default: none)'
-    )
-
-    parser.add_argument(
-        '-e', '--exclude',
-        type=str,
-        nargs='+',
-        help='Patterns to exclude from processing (e.g., "test" "temp")'
-    )
-
-    parser.add_argument(
-        '-o', '--output',
-        type=str,
-        help='Output file name (without extension, default: based on output type and summary level)'
-    )
-
-    parser.add_argument(
-        '-t', '--output-type',
-        type=str,
-        choices=['py', 'ipynb', 'both'],
-        default='both',
-        help='Output file type (default: both)'
-    )
-
-    parser.add_argument(
-        '-r', '--report',
-        action='store_true',
-        default=None,
-        help='Generate dependency report and ASCII visualization. By default, reports are '
-            'included for interface/core summary levels and excluded for complete code '
-            'and notebooks. This flag overrides that behavior.'
-    )
-
-    parser.add_argument(
-        '--report-only',
-        action='store_true',
-        dest='report_only',
-        help='Suppress code summarization or notebook cocatenization' 
-    )
-    
-    parser.add_argument('--numeric-labels', action='store_true', dest="use_numeric", help='Use numbers instead of letters for node labels')
-    
-    # Add a no-report option for when you want to suppress reports in INTERFACE/CORE
-    parser.add_argument(
-        '--no-report',
-        action='store_false',
-        dest='report',
-        help='Suppress dependency report generation even for interface/core summary levels'
-    )
-
-    parser.add_argument(
-        '--elide-disconnected',
-        action='store_true',
-        help='Remove modules with no dependencies from visualization'
-    )
-
-    parser.add_argument(
-        '-d', '--debug',
-        action='store_true',
-        help='Enable debug output'
-    )
-
-    parser.add_argument(
-        '--debug-prefix',
-        type=str,
-        default='CCAT:',
-        help='Prefix for debug messages (default: CCAT:)'
-    )
-
-    parser.add_argument(
-        '--version',
-        action='version',
-        version=f'%(prog)s {__version__}'
-    )
-
-    return parser
-
-#
-#if __name__ == "__main__":
-#    debug = True
-#    generate_report = True
-#    # Example with different summary levels for Python output
-#    examples = {
-#        SummaryLevel.INTERFACE: "signatures_only.py",
-#        SummaryLevel.CORE: "essential_code.py",
-#        SummaryLevel.NONE: "complete_code.py",
-#    }
-#    
-#    for level, filename in examples.items():
-#        cat = ChimeraCat(
-#            "src", 
-#            exclude_patterns=["tools\\", ".ipynb", "cats\\"], 
-#            summary_level=level, 
-#            debug=debug, 
-#            debug_str="DBG: ", 
-#            elide_disconnected_deps=True,
-#            generate_report=generate_report
-#        )
-#        output_file = cat.generate_concat_file(filename)
-#        print(f"Generated {level.value} version: {output_file}")
-#    
-#    # Generate notebook with complete code
-#    cat = ChimeraCat(
-#        "src", 
-#        exclude_patterns=["tools\\", ".ipynb", "cats\\"], 
-#        elide_disconnected_deps=True,
-#    )
-#    output_file = cat.generate_colab_notebook("colab_ready.ipynb")
-#    print(f"Generated notebook version: {output_file}")
-#
-#    if debug:
-#        cat.visualize_dependencies("module_deps.png")
-#        if generate_report:
-#            report = cat.get_dependency_report()
-#            print(report)
\ No newline at end of file
+"""ChimeraCat: Intelligent code concatenator and summarizer for LLM analysis.
+
+Analyzes Python codebases to generate consolidated files optimized for LLM processing,
+with configurable summarization to reduce token usage while preserving key information.
+
+Args:
+    src_dir (str): Source directory containing Python files (default: "src")
+    summary_level (SummaryLevel): Summarization level (INTERFACE/CORE/NONE)
+    exclude_patterns (List[str]): Patterns to exclude from processing
+    rules (Optional[SummaryRules]): Custom summarization rules
+    elide_disconnected_deps (bool): Omit disconnected modules from visualization
+    generate_report (Optional[bool]): Include dependency analysis report
+    report_only (bool): Generate only the dependency report
+    use_numeric (bool): Use numeric instead of alpha labels in visualizations
+    debug (bool): Enable debug output
+    debug_str (str): Prefix for debug messages
+    cache_file (Union[str, bool, None]): Per-file analysis cache (default: True, per project)
+    parallel_io (bool): Read and analyze files in parallel (default: True)
+    jobs (Optional[int]): Worker processes for scanning (default: 1, in-process)
+    fast_deps (bool): Scan files with a regex instead of parsing them (default: False)
+
+Key Features:
+    - Analyzes Python files for imports and definitions
+    - Builds dependency graphs and orders modules without third-party graph libraries
+    - Generates both .py files and Colab notebooks
+    - Smart handling of internal/external imports
+    - Configurable code summarization
+
+Configuration Details:
+    src_dir: Source directory to analyze. Defaults to "./src" in cwd.
+    
+    summary_level: Controls summarization aggressiveness:
+        - NONE: Full code output
+        - INTERFACE: Preserve signatures/types/docstrings only
+        - CORE: Include core logic, skip standard patterns
+    
+    exclude_patterns: Files matching these patterns are skipped. Plain
+        patterns match anywhere in the path; patterns containing *, ? or [
+        are shell-style globs (e.g. "*.ipynb"). Directories a pattern fully
+        excludes are not walked, and .git, __pycache__, .venv and
+        node_modules are always skipped.
+        Note: ChimeraCat always excludes itself to avoid recursion.
+    
+    rules: Override default summarization rules with custom SummaryRules.
+        Useful for domain-specific boilerplate detection. A level's patterns
+        run in one pass, core before interface; SummaryRules(sequential=True)
+        applies them one pass per pattern instead.
+    
+    elide_disconnected_deps: When True, omit modules with no dependencies
+        from visualization. Useful for cleaner dependency graphs.
+    
+    generate_report: Controls inclusion of dependency analysis.
+        Defaults to True for INTERFACE/CORE summaries. When False, generated
+        files omit the directory tree and ASCII dependency graph.
+    
+    report_only: Generate only dependency report without code output.
+    
+    use_numeric: Use numbers instead of letters for node labels.
+    
+    cache_file: JSON file caching each module's imports/classes/functions,
+        keyed on path, mtime and size. Unchanged files are not rescanned on
+        later runs, and entries for files no longer found under src_dir are
+        dropped. True (the default) uses one file per src_dir in the user
+        cache directory ($XDG_CACHE_HOME or ~/.cache, under
+        chimeracat/<version>/); a path uses that file. Pass None to disable.
+    
+    parallel_io: Read and analyze source files on a small thread pool so
+        disk reads overlap on cold caches. When many files need scanning,
+        parsing is first spread across a process pool when jobs allows it.
+        Module order is unaffected.
+
+    jobs: Number of worker processes for that scan, at least 1. The default
+        of 1 scans in this process only; None uses one per core, as the
+        CLI does unless -j is given.
+
+    fast_deps: Find imports, classes and functions with a single regex
+        pass instead of parsing each file, several times faster on cold
+        caches. Approximate: only column-0 imports are seen, so indented
+        ones (under try/if) are missed while import lines at the start of
+        a line inside multi-line strings are picked up; class and def names
+        match anywhere, comments and strings included. Results from full
+        parses are still reused when cached.
+
+Example:
+    ```python
+    # Generate both notebook and summarized Python file
+    cat = ChimeraCat(
+        "src",
+        summary_level=SummaryLevel.INTERFACE,
+        exclude_patterns=["tests"],
+        elide_disconnected_deps=True
+    )
+    notebook = cat.generate_colab_notebook()
+    py_file = cat.generate_concat_file()
+    ```
+"""
+
+import ast
+import fnmatch
+import io
+import itertools
+import os
+import re
+import string
+import sys
+from array import array
+from dataclasses import dataclass, field
+from datetime import datetime
+from enum import Enum
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Dict, List, Set, Tuple, Optional, Pattern, Union
+
+from . import __version__
+
+if TYPE_CHECKING:
+    import argparse
+
+def _user_cache_dir() -> Path:
+    """Per-user cache directory for this version of ChimeraCat"""
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return Path(base) / 'chimeracat' / __version__
+
+DEFAULT_CACHE_DIR = _user_cache_dir()
+
+def default_cache_file(src_dir: Union[str, Path]) -> Path:
+    """Analysis cache file for one source tree, named by a hash of its resolved path"""
+    import hashlib
+    digest = hashlib.sha1(str(Path(src_dir).resolve()).encode('utf-8')).hexdigest()[:16]
+    return DEFAULT_CACHE_DIR / f'{digest}.json'
+
+# Bump when the shape of cached analysis entries changes
+_CACHE_FORMAT = 4
+
+# Analysis entries scanned in this process, in the cache file's format and
+# keyed the same way; shared by all instances, e.g. one per summary level
+_scan_memo: Dict[str, list] = {}
+
+# Below this many unscanned files, process pool startup costs more than it saves
+_PROCESS_SCAN_MIN = 64
+
+# Lines that _process_imports rewrites: 'from .x import y' at any indent;
+# a bytes pattern, as scanning works on the undecoded file
+_RELATIVE_FROM = re.compile(rb'^[^\S\n]*from[^\S\n]+\.', re.MULTILINE)
+
+# The same lines as an alternative to fuse into the summary pattern
+_RELATIVE_LINE = r'(?m:^(?P<_relimport>(?P<_relindent>[^\S\n]*)from[^\S\n]+\.[^\n]*))'
+
+def _wrap_relative_import(match: re.Match) -> str:
+    """Comment out a relative import line, as _process_imports does"""
+    spaces = ' ' * len(match.group('_relindent'))
+    return f'{spaces}"""RELATIVE_IMPORT: \n{match.group("_relimport")}\n{spaces}"""'
+
+# Single-pass scanner for imports and definitions, used when a file does not
+# parse as Python; dispatch on m.lastgroup
+_COMBINED = re.compile(
+    r'^(?:from\s+(?P<from>\S+)\s+import\s+[^#\n]+|import\s+(?P<imp>[^#\n]+))'
+    r'|class\s+(?P<cls>\w+)'
+    r'|def\s+(?P<fn>\w+)',
+    re.MULTILINE
+)
+
+def _alpha_labels():
+    """Yield short labels A, B, ..., Z, AA, AB, ... without end"""
+    for width in itertools.count(1):
+        for letters in itertools.product(string.ascii_uppercase, repeat=width):
+            yield ''.join(letters)
+
+# Directories that never hold project modules; never descended into
+_SKIP_DIRS = frozenset({'.git', '__pycache__', '.venv', 'node_modules'})
+
+def _iter_py_files(root, prune: Optional[Callable[[str], bool]] = None,
+                   exclude: Optional[Callable[[str], bool]] = None,
+                   onerror: Optional[Callable[[OSError], None]] = None):
+    """Yield (path, stat) for every .py file under root, in the same order as rglob.
+
+    Directories in _SKIP_DIRS, or whose path prune() returns True for, are
+    skipped without being listed. Files whose path exclude() returns True for
+    are dropped before a Path is built for them. Directories that cannot be
+    listed are skipped, as rglob does; onerror, if given, is called with the
+    OSError, as with os.walk.
+    """
+    stack = [os.fspath(root)]
+    while stack:
+        subdirs = []
+        try:
+            entries = os.scandir(stack.pop())
+        except OSError as e:
+            if onerror is not None:
+                onerror(e)
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in _SKIP_DIRS and not (prune and prune(entry.path)):
+                        subdirs.append(entry.path)
+                elif (entry.name.endswith('.py') and entry.is_file()
+                      and not (exclude and exclude(entry.path))):
+                    yield Path(entry.path), entry.stat()
+        # Reversed, so subdirectories are popped and walked in listing order
+        stack.extend(reversed(subdirs))
+
+class SummaryLevel(Enum):
+    INTERFACE = "interface"     # Just interfaces/types/docstrings
+    CORE = "core"              # + Core logic, skip standard patterns
+    NONE = "none"      # Full code
+
+@dataclass(frozen=True, slots=True)
+class SummaryPattern:
+    """Pattern for code summarization with explanation.
+
+    Frozen, since the compiled pattern and replacement are derived once from the fields.
+    """
+    pattern: str
+    replacement: str
+    explanation: str
+    flags: re.RegexFlag = re.MULTILINE
+    _compiled: Pattern = field(init=False, repr=False, compare=False)
+    _replacement: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, '_compiled', re.compile(self.pattern, self.flags))
+        object.__setattr__(self, '_replacement', f"{self.replacement} # {self.explanation}\n")
+
+    def __reduce__(self):
+        # Rebuild from the fields; frozen slotted instances can't be restored via setattr on 3.10
+        return (SummaryPattern, (self.pattern, self.replacement, self.explanation, self.flags))
+
+    def apply(self, content: str) -> str:
+        return self._compiled.sub(self._replacement, content)
+
+# Inline-flag letters for embedding a pattern's flags in a combined pattern
+_INLINE_FLAGS = ((re.ASCII, 'a'), (re.IGNORECASE, 'i'), (re.MULTILINE, 'm'),
+                 (re.DOTALL, 's'), (re.VERBOSE, 'x'))
+
+def _shift_group_refs(template: str, offset: int) -> str:
+    """Renumber \\N and \\g<N> group references in a replacement template by offset"""
+    def shift(match: re.Match) -> str:
+        number = match.group(1) or match.group(2)
+        return f"\\g<{int(number) + offset}>" if number else match.group()
+    return re.sub(r'\\(?:g<(\d+)>|([1-9]\d?)|\\)', shift, template)
+
+@dataclass(slots=True)
+class SummaryRules:
+    """Collection of patterns for different summary levels.
+
+    Patterns for a level run as one alternation in a single pass: at CORE the
+    core patterns come first, so they win over the interface ones where both
+    match. Set sequential to apply each pattern in its own pass instead, in
+    list order (interface, then core), for rules written to build on each other.
+    """
+    interface: List[SummaryPattern] = field(default_factory=list)
+    core: List[SummaryPattern] = field(default_factory=list)
+    sequential: bool = False
+
+    @classmethod
+    def default_rules(cls) -> 'SummaryRules':
+        # Fresh lists so callers can extend them, sharing the compiled patterns
+        interface, core = cls._default_patterns()
+        return cls(interface=list(interface), core=list(core))
+
+    @staticmethod
+    @lru_cache(maxsize=1)
+    def _default_patterns() -> Tuple[Tuple[SummaryPattern, ...], Tuple[SummaryPattern, ...]]:
+        """Build (and compile) the default patterns once per process"""
+        return (
+            (
+                SummaryPattern(
+                    pattern=r'(class\s+\w+(?:\([^)]*\))?):(?:\s*"""[^"]*""")?[^\n]*(?:\n(?!class|def)[^\n]*)*',
+                    replacement=r'\1:\n    ... # ',
+                    explanation="Class interface preserved",
+                    flags=re.MULTILINE
+                ),
+                SummaryPattern(
+                    pattern=r'(def\s+\w+\s*\([^)]*\)):(?:\s*"""[^"]*""")?[^\n]*(?:\n(?!class|def)[^\n]*)*',
+                    replacement=r'\1:\n    ... # ',
+                    explanation="Function signature preserved",
+                    flags=re.MULTILINE
+                ),
+            ),
+            (
+                SummaryPattern(
+                    pattern=r'(def\s+get_\w+\([^)]*\)):\s*return[^\n]*\n',
+                    replacement=r'\1:\n    ... # ',
+                    explanation="Getter method summarized"
+                ),
+                SummaryPattern(
+                    pattern=r'(def\s*__init__\s*\([^)]*\)):[^\n]*(?:\n(?!def|class)[^\n]*)*',
+                    replacement=r'\1:\n    ... # ',
+                    explanation="Standard initialization summarized"
+                ),
+            ),
+        )
+
+    def compile(self, level: SummaryLevel) -> Optional[Tuple[Pattern, Dict[str, Callable[[re.Match], str]]]]:
+        """Combine the patterns for a level into one alternation for a single-pass sub.
+
+        Returns (combined_pattern, group_to_replacement), where each pattern is a
+        named alternative and group_to_replacement maps its name to a callback
+        producing the replacement. Returns None if the rules are sequential, the
+        level has no patterns, or they cannot be combined (e.g. they reuse group
+        names), in which case apply them one by one.
+        """
+        # Core first: the interface def rule would otherwise claim every function
+        patterns = self.interface if level == SummaryLevel.INTERFACE else self.core + self.interface
+        if self.sequential or not patterns:
+            return None
+        alternatives = []
+        group_to_replacement = {}
+        offset = 0
+        for i, pattern in enumerate(patterns):
+            name = f"_rule{i}"
+            letters = ''.join(letter for flag, letter in _INLINE_FLAGS if pattern.flags & flag)
+            alternatives.append(f"(?P<{name}>(?{letters}:{pattern.pattern}))" if letters
+                                else f"(?P<{name}>{pattern.pattern})")
+            template = _shift_group_refs(pattern._replacement, offset + 1)
+            group_to_replacement[name] = lambda m, t=template: m.expand(t)
+            offset += pattern._compiled.groups + 1
+        try:
+            return re.compile('|'.join(alternatives)), group_to_replacement
+        except re.error:
+            return None
+
+class _FusedVisitor(ast.NodeVisitor):
+    """Collect module-level imports and all class/function names in one traversal"""
+    def __init__(self):
+        self.imports: Set[str] = set()
+        self.targets: List[Tuple[int, str]] = []
+        self.classes: Set[str] = set()
+        self.functions: Set[str] = set()
+
+    # Only statements starting in column 0 are module level; nested imports are skipped
+    def visit_Import(self, node: ast.Import):
+        if node.col_offset == 0:
+            for alias in node.names:
+                name = sys.intern(alias.name)
+                self.imports.add(sys.intern(f"{name} as {alias.asname}") if alias.asname else name)
+                self.targets.append((0, name))
+
+    def visit_ImportFrom(self, node: ast.ImportFrom):
+        if node.col_offset == 0:
+            module = sys.intern(node.module or '')
+            self.imports.add(sys.intern('.' * node.level + module) if node.level else module)
+            self.targets.append((node.level, module))
+
+    def visit_ClassDef(self, node: ast.ClassDef):
+        self.classes.add(node.name)
+        self.generic_visit(node)
+
+    def visit_FunctionDef(self, node: ast.FunctionDef):
+        self.functions.add(node.name)
+        self.generic_visit(node)
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def generic_visit(self, node: ast.AST):
+        # Definitions and imports are always statements, so only descend into
+        # statement blocks and never into expressions
+        for field in ('body', 'orelse', 'finalbody', 'handlers', 'cases'):
+            for child in getattr(node, field, ()):
+                self.visit(child)
+
+def _scan_file(file_path: Path, stat: os.stat_result,
+               debug_print: Optional[Callable[[str], None]] = None, fast: bool = False) -> list:
+    """Read and scan a file, returning its analysis cache entry.
+
+    Module-level so process pools can run it. The file is read as bytes and
+    only decoded by the parser itself, or for the regex scan. With fast, the
+    regex scan is used outright and the entry is marked as approximate.
+    """
+    content = file_path.read_bytes()
+    if b'import' not in content and b'class' not in content and b'def' not in content:
+        # Cheap literal prefilter: nothing either scanner could find
+        imports, targets, classes, functions = set(), [], set(), set()
+        fast = False
+    elif fast:
+        imports, targets, classes, functions = ChimeraCat._scan_content(
+            content.decode('utf-8', errors='replace'))
+    else:
+        try:
+            imports, targets, classes, functions = ChimeraCat._parse_content(content, str(file_path))
+        except (SyntaxError, ValueError) as e:
+            if debug_print:
+                debug_print(f"falling back to regex scan for {file_path}: {e}")
+            imports, targets, classes, functions = ChimeraCat._scan_content(
+                content.decode('utf-8', errors='replace'))
+    has_relative = _RELATIVE_FROM.search(content) is not None
+    return [stat.st_mtime_ns, stat.st_size,
+            sorted(imports), sorted(classes), sorted(functions),
+            targets, has_relative, not fast]
+
+def _scan_file_noting(file_path: Path, stat: os.stat_result, fast: bool = False) -> Tuple[list, List[str]]:
+    """_scan_file for pool workers: returns the entry with any debug notes,
+    which the parent prints since a worker's output goes nowhere useful."""
+    notes: List[str] = []
+    return _scan_file(file_path, stat, notes.append, fast), notes
+
+@dataclass(slots=True)
+class ModuleInfo:
+    """Information about a Python module"""
+    path: Path
+    imports: Set[str]
+    classes: Set[str]
+    functions: Set[str]
+    # (level, module) for each module-level import; level 0 is absolute
+    import_targets: List[Tuple[int, str]] = field(default_factory=list)
+    has_relative_imports: bool = False  # any 'from .' line, at any indent
+    rel_posix: str = ""  # path relative to src_dir, with forward slashes
+    parent_posix: str = ""  # containing directory relative to src_dir ("." at the root)
+
+    def read_content(self) -> str:
+        """Read the module's source text; not kept, so only metadata stays in memory"""
+        return self.path.read_text(encoding='utf-8', errors='replace')
+
+class ChimeraCat:
+    """Utility to concatenate modular code into Colab-friendly single files"""
+    def __init__(self, 
+             src_dir: str = "src", 
+             summary_level: SummaryLevel = SummaryLevel.NONE,
+             exclude_patterns: Optional[List[str]] = None,
+             rules: Optional[SummaryRules] = None,
+             elide_disconnected_deps: bool = False,
+             generate_report: Optional[bool] = None,
+             report_only: bool = False,
+             use_numeric: bool = False,
+             debug: bool = False,
+             debug_str: str = "",
+             cache_file: Union[str, Path, bool, None] = True,
+             parallel_io: bool = True,
+             jobs: Optional[int] = 1,
+             fast_deps: bool = False):
+
+        self.src_dir = Path(src_dir)
+        self.summary_level = summary_level
+        self.report_only = report_only
+        self.use_numeric = use_numeric
+        self.rules = rules or SummaryRules.default_rules()
+        # Combined summary patterns, keyed by level, relative-import rewriting and
+        # the rules themselves, so reassigning either attribute is picked up
+        self._compiled_rules: Dict[tuple, tuple] = {}
+        self.modules: Dict[Path, ModuleInfo] = {}
+        # Dependency graph as ordered adjacency lists; an edge a -> b means a imports b
+        self._succ: Dict[Path, List[Path]] = {}
+        self._pred: Dict[Path, List[Path]] = {}
+        self._nx_graph = None
+        # Frozen (nodes, indptr, indices) CSR form of _succ for the graph algorithms
+        self._csr_cache: Optional[Tuple[List[Path], array, array]] = None
+        self._sorted_cache: Optional[List[Path]] = None
+        self._cycles_cache: Optional[List[List[Path]]] = None
+        self._order_cached = False
+        self._graph_built = False
+        # Rendered report pieces, keyed by method name; cleared on rebuild
+        self._render_cache: Dict[str, object] = {}
+        self.self_path = Path(__file__).resolve()
+        self.exclude_patterns = exclude_patterns or []
+        self._exclude_re = self._compile_exclude_patterns(self.exclude_patterns)
+        # Patterns that, once they match a directory, match everything inside it
+        self._prune_re = self._compile_exclude_patterns(
+            [p for p in self.exclude_patterns if p.endswith('*') or not any(c in p for c in '*?[')])
+        self._exclude_cache: Dict[str, bool] = {}
+        self.debug = debug
+        self.elide_disconnected_deps = elide_disconnected_deps
+        self.debug_str = debug_str
+        if cache_file is True:
+            self.cache_file = default_cache_file(self.src_dir)
+        else:
+            self.cache_file = Path(cache_file) if cache_file else None
+        self._cache_dirty = False
+        self._analysis_cache = self._load_cache()
+        self.parallel_io = parallel_io
+        if jobs is not None and jobs < 1:
+            raise ValueError(f"jobs must be at least 1, got {jobs}")
+        self.jobs = jobs
+        self.fast_deps = fast_deps
+
+        self.generate_report = self._report_default(summary_level) if generate_report is None else generate_report
+
+    @staticmethod
+    def _report_default(summary_level: SummaryLevel) -> bool:
+        """Reports are on for summarized output and off for complete code"""
+        return summary_level in (SummaryLevel.INTERFACE, SummaryLevel.CORE)
+
+    def clone_with(self, summary_level: SummaryLevel, generate_report: Optional[bool] = None) -> "ChimeraCat":
+        """Return a copy that renders at another summary level.
+
+        The copy shares this instance's scanned modules, dependency graph and
+        rendered report pieces, so the source tree is only walked and parsed
+        once. generate_report defaults by summary level, as in __init__.
+        """
+        import copy
+        self.build_dependency_graph()
+        clone = copy.copy(self)
+        clone.summary_level = summary_level
+        clone._compiled_rules = {}
+        clone.generate_report = self._report_default(summary_level) if generate_report is None else generate_report
+        return clone
+
+    def _debug_print(self, *args, **kwargs):
+        """Helper for debug output"""
+        if self.debug:
+            print(f"{self.debug_str}: {args} {list(kwargs.items())}")
+
+    def _load_cache(self) -> Dict[str, list]:
+        """Load cached per-file analysis results, discarding caches from other versions"""
+        if self.cache_file is None or not self.cache_file.exists():
+            return {}
+        import json
+        try:
+            with open(self.cache_file, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            self._debug_print(f"ignoring unreadable cache {self.cache_file}: {e}")
+            return {}
+        if (not isinstance(data, dict) or data.get('version') != __version__
+                or data.get('format') != _CACHE_FORMAT or not isinstance(data.get('files'), dict)):
+            return {}
+        files = {key: entry for key, entry in data['files'].items() if self._valid_entry(entry)}
+        if len(files) != len(data['files']):
+            self._debug_print(f"dropped {len(data['files']) - len(files)} malformed cache entries")
+            self._cache_dirty = True
+        return files
+
+    @staticmethod
+    def _valid_entry(entry) -> bool:
+        """Whether a loaded cache entry has the shape analyze_file expects"""
+        return (isinstance(entry, list) and len(entry) == 8
+                and isinstance(entry[0], int) and isinstance(entry[1], int)
+                and all(isinstance(names, list) and all(isinstance(n, str) for n in names)
+                        for names in entry[2:5])
+                and isinstance(entry[5], list)
+                and all(isinstance(t, list) and len(t) == 2
+                        and isinstance(t[0], int) and isinstance(t[1], str) for t in entry[5])
+                and isinstance(entry[6], bool) and isinstance(entry[7], bool))
+
+    def _prune_cache(self, entries: List[Tuple[Path, os.stat_result]]) -> None:
+        """Drop cached entries for files under src_dir that the walk no longer found"""
+        prefix = os.path.join(os.path.abspath(self.src_dir), '')
+        seen = {os.path.abspath(file_path) for file_path, _ in entries}
+        stale = [key for key in self._analysis_cache if key.startswith(prefix) and key not in seen]
+        for key in stale:
+            del self._analysis_cache[key]
+        if stale:
+            self._debug_print(f"dropped {len(stale)} stale cache entries")
+            self._cache_dirty = True
+
+    def _save_cache(self):
+        """Persist per-file analysis results if anything changed"""
+        if self.cache_file is None or not self._cache_dirty:
+            return
+        import json
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            # Write beside the target and swap it in, so concurrent runs never
+            # see a half-written cache
+            tmp_file = self.cache_file.with_name(f"{self.cache_file.name}.{os.getpid()}.tmp")
+            with open(tmp_file, 'w') as f:
+                json.dump({'version': __version__, 'format': _CACHE_FORMAT,
+                           'files': self._analysis_cache}, f)
+            os.replace(tmp_file, self.cache_file)
+            self._cache_dirty = False
+        except OSError as e:
+            self._debug_print(f"could not write cache {self.cache_file}: {e}")
+
+    @staticmethod
+    def _compile_exclude_patterns(patterns: List[str]) -> Optional[Pattern]:
+        """Compile exclude patterns into one regex: globs via fnmatch, anything else as a substring.
+
+        Either path separator in a pattern matches the platform's own, so
+        "tools\\" and "tools/" behave the same on Windows and Linux.
+        """
+        if not patterns:
+            return None
+        normalized = (p.replace('\\', '/').replace('/', os.sep) for p in patterns)
+        return re.compile('|'.join(
+            fnmatch.translate(p) if any(c in p for c in '*?[') else re.escape(p)
+            for p in normalized
+        ))
+
+    @property
+    def dep_graph(self):
+        """NetworkX view of the dependency graph, built on demand for rendering"""
+        if self._nx_graph is None:
+            import networkx as nx
+            graph = nx.DiGraph()
+            graph.add_nodes_from(self._succ)
+            graph.add_edges_from((src, dst) for src, dsts in self._succ.items() for dst in dsts)
+            self._nx_graph = graph
+        return self._nx_graph
+
+    def _add_node(self, node: Path):
+        self._succ.setdefault(node, [])
+        self._pred.setdefault(node, [])
+
+    def _add_edge(self, src: Path, dst: Path):
+        self._add_node(src)
+        self._add_node(dst)
+        if dst not in self._succ[src]:
+            self._succ[src].append(dst)
+            self._pred[dst].append(src)
+
+    def _edge_count(self) -> int:
+        return sum(len(dsts) for dsts in self._succ.values())
+
+    def should_exclude(self, file_path: Union[str, Path]) -> bool:
+        """Check if a file should be excluded from processing"""
+        str_path = os.fspath(file_path)
+        cached = self._exclude_cache.get(str_path)
+        if cached is not None:
+            return cached
+
+        # Always exclude self; only files sharing our name are worth a samefile stat
+        if os.path.basename(str_path) == self.self_path.name and self._is_self(str_path):
+            self._debug_print(f"excluding self {self.self_path}")
+            excluded = True
+        else:
+            # Check against exclude patterns
+            if self.debug:
+                self._debug_print("str_path",str_path)
+                for pattern in self.exclude_patterns:
+                    self._debug_print("comparing", pattern, str_path)
+            excluded = self._exclude_re is not None and self._exclude_re.search(str_path) is not None
+
+        self._exclude_cache[str_path] = excluded
+        return excluded
+
+    def _prune_dir(self, dir_path: str) -> bool:
+        """Check if every file under a directory would be excluded, so it can be skipped"""
+        if self._prune_re is None or self._prune_re.search(dir_path + os.sep) is None:
+            return False
+        self._debug_print(f"pruning excluded directory {dir_path}")
+        return True
+
+    def _is_self(self, str_path: str) -> bool:
+        try:
+            return os.path.samefile(str_path, self.self_path)
+        except OSError:
+            return False
+
+    def _exclude_walked(self, file_path: str) -> bool:
+        """should_exclude for the directory walk, with the same debug note as analyze_file"""
+        if self.should_exclude(file_path):
+            self._debug_print(f'excluding {file_path}')
+            return True
+        return False
+
+    def analyze_file(self, file_path: Path, stat: Optional[os.stat_result] = None) -> Optional[ModuleInfo]:
+        """Analyze a Python file for imports and definitions"""
+        if self.should_exclude(file_path):
+            self._debug_print(f'excluding {file_path}')
+            return None
+
+        # Reuse a previous scan if the file is unchanged since it was cached
+        if stat is None:
+            stat = file_path.stat()
+        key = os.path.abspath(file_path)
+        entry = self._analysis_cache.get(key)
+        if not self._entry_usable(entry, stat):
+            entry = _scan_memo.get(key)
+            if not self._entry_usable(entry, stat):
+                entry = _scan_memo[key] = self._scan_file(file_path, stat)
+            self._analysis_cache[key] = entry
+            self._cache_dirty = True
+
+        imports = set(map(sys.intern, entry[2]))
+        classes, functions = set(entry[3]), set(entry[4])
+        targets = [(level, sys.intern(name)) for level, name in entry[5]]
+        has_relative = entry[6]
+        
+        rel_posix = file_path.relative_to(self.src_dir).as_posix()
+        return ModuleInfo(
+            path=file_path,
+            imports=imports,
+            classes=classes,
+            functions=functions,
+            import_targets=targets,
+            has_relative_imports=has_relative,
+            rel_posix=rel_posix,
+            parent_posix=rel_posix.rpartition('/')[0] or '.'
+        )
+
+    def _entry_usable(self, entry: Optional[list], stat: os.stat_result) -> bool:
+        """Whether a cached entry is current, and precise enough for this instance"""
+        return (entry is not None and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size
+                and (entry[7] or self.fast_deps))
+
+    def _scan_file(self, file_path: Path, stat: os.stat_result) -> list:
+        """Read and scan a file, returning its analysis cache entry"""
+        return _scan_file(file_path, stat, self._debug_print, self.fast_deps)
+
+    def _prescan(self, entries: List[Tuple[Path, os.stat_result]]) -> None:
+        """Scan files missing from both caches across a process pool.
+
+        Parsing is CPU-bound, so threads don't help with it; results land in
+        _scan_memo, where analyze_file picks them up. Skipped for small batches.
+        """
+        pending = []
+        for file_path, stat in entries:
+            key = os.path.abspath(file_path)
+            for cache in (self._analysis_cache, _scan_memo):
+                if self._entry_usable(cache.get(key), stat):
+                    break
+            else:
+                if not self.should_exclude(file_path):
+                    pending.append((key, file_path, stat))
+        workers = self.jobs or os.cpu_count() or 1
+        if len(pending) < _PROCESS_SCAN_MIN or workers < 2:
+            return
+        from concurrent.futures import BrokenExecutor, ProcessPoolExecutor
+        self._debug_print(f"Scanning {len(pending)} files on {workers} processes")
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                scanned = pool.map(_scan_file_noting, [p for _, p, _ in pending],
+                                   [st for _, _, st in pending], itertools.repeat(self.fast_deps),
+                                   chunksize=32)
+                for (key, _, _), (entry, notes) in zip(pending, scanned):
+                    _scan_memo[key] = entry
+                    for note in notes:
+                        self._debug_print(note)
+        except (OSError, NotImplementedError, BrokenExecutor) as e:
+            # No working multiprocessing here (or a worker died, e.g. a spawned
+            # worker re-running an unguarded __main__); analyze_file scans what's left
+            self._debug_print(f"process pool unavailable, scanning serially: {e}")
+
+    @staticmethod
+    def _parse_content(content: Union[str, bytes], filename: str = '<unknown>'
+                       ) -> Tuple[Set[str], List[Tuple[int, str]], Set[str], Set[str]]:
+        """Find module-level imports and all class/function definitions from the AST.
+
+        Returns (imports, import_targets, classes, functions). Imports keep their
+        source spelling (".core", "numpy as np"); import_targets holds the
+        (level, module) pair of each, for resolving them against the tree.
+        Import strings are interned, as the same few recur across most modules.
+        Bytes are decoded by the parser, honouring any coding declaration.
+        """
+        visitor = _FusedVisitor()
+        visitor.visit(ast.parse(content, filename=filename))
+        return visitor.imports, list(dict.fromkeys(visitor.targets)), visitor.classes, visitor.functions
+
+    @staticmethod
+    def _scan_content(content: str) -> Tuple[Set[str], List[Tuple[int, str]], Set[str], Set[str]]:
+        """Find imports, classes and functions in a single regex scan (no AST needed)"""
+        imports = set()
+        classes = set()
+        functions = set()
+        for match in _COMBINED.finditer(content):
+            kind = match.lastgroup
+            if kind == 'from':  # from X import Y
+                imports.add(sys.intern(match.group('from')))
+            elif kind == 'imp':  # import X
+                imports.add(sys.intern(match.group('imp').split(',')[0].strip()))
+            elif kind == 'cls':
+                classes.add(match.group('cls'))
+            else:
+                functions.add(match.group('fn'))
+        targets = []
+        for imp in sorted(imports):
+            module = imp.lstrip('.')
+            targets.append((len(imp) - len(module), sys.intern(module.split(' ')[0])))
+        return imports, targets, classes, functions
+
+    def _rules_need_defs(self) -> bool:
+        """Whether only default rules are in use; they only touch class/def blocks"""
+        defaults = set(itertools.chain.from_iterable(SummaryRules._default_patterns()))
+        return all(pattern in defaults for pattern in itertools.chain(self.rules.interface, self.rules.core))
+
+    def _get_compiled_rules(self, rewrite_relative: bool = False) -> tuple:
+        """Combined pattern for the current level, optionally also matching relative imports.
+
+        Returns () when the rules cannot be combined.
+        """
+        rules = self.rules
+        key = (self.summary_level, rewrite_relative, rules.sequential,
+               tuple(rules.interface), tuple(rules.core))
+        if key not in self._compiled_rules:
+            compiled = rules.compile(self.summary_level)
+            if compiled and rewrite_relative:
+                combined, group_to_replacement = compiled
+                try:
+                    # Appended last so the rules' own group numbers are unchanged
+                    compiled = (re.compile(f"{combined.pattern}|{_RELATIVE_LINE}"),
+                                {**group_to_replacement, '_relimport': _wrap_relative_import})
+                except re.error:
+                    compiled = None
+            self._compiled_rules[key] = compiled or ()
+        return self._compiled_rules[key]
+
+    def _summarize_content(self, content: str, rewrite_relative: bool = False) -> str:
+        """Apply summary patterns based on current level.
+
+        With rewrite_relative, relative imports are also commented out as by
+        _process_imports, in the same pass over the text where possible.
+        """
+        if not isinstance(content, str):
+            raise TypeError(f"Expected string content but got {type(content)}: {content}")
+            
+        if self.summary_level == SummaryLevel.NONE:
+            return self._process_imports(content) if rewrite_relative else content
+            
+        # Apply all patterns for the level in one pass when they combine cleanly
+        compiled = self._get_compiled_rules(rewrite_relative)
+        if compiled:
+            combined, group_to_replacement = compiled
+            return combined.sub(lambda m: group_to_replacement[m.lastgroup](m), content)
+
+        result = content
+        rules = self.rules
+        
+        # Apply patterns based on level
+        if self.summary_level == SummaryLevel.INTERFACE:
+            for pattern in rules.interface:
+                result = pattern.apply(result)
+        elif self.summary_level == SummaryLevel.CORE:
+            # Apply both interface and core patterns
+            for pattern in rules.interface + rules.core:
+                result = pattern.apply(result)
+                
+        return self._process_imports(result) if rewrite_relative else result
+
+    def _process_imports(self, content: str, module_path: Optional[Path] = None) -> str:
+        """Process and adjust imports for concatenated context"""
+        if not isinstance(content, str):
+            raise TypeError(f"Expected string content but got {type(content)}: {content}")
+
+        out = []
+        for line in content.split('\n'):
+            stripped = line.lstrip()
+            if stripped[:4] == 'from' and stripped[4:5].isspace() and stripped[5:].lstrip().startswith('.'):
+                spaces = ' ' * (len(line) - len(stripped))
+                out.extend([f'{spaces}"""RELATIVE_IMPORT: ', line, f'{spaces}"""'])
+            else:
+                out.append(line)
+        return '\n'.join(out)
+
+    def build_dependency_graph(self, force: bool = False) -> None:
+        """Build a dependency graph with proper relative import resolution.
+
+        The graph is built once per instance; later calls are no-ops unless
+        force is True, which rescans the source tree from scratch.
+        """
+        if self._graph_built and not force:
+            return
+        self._debug_print("\nBuilding dependency graph...")
+        self._order_cached = False
+        self._nx_graph = None
+        self._csr_cache = None
+        self._cycles_cache = None
+        # Fresh containers rather than clear(): clone_with copies share them
+        self._render_cache = {}
+        self.modules = {}
+        self._succ = {}
+        self._pred = {}
+        self._analysis_cache = dict(self._analysis_cache)
+        
+        if not self.src_dir.is_dir():
+            raise FileNotFoundError(f"Source directory not found: {self.src_dir}")
+
+        # First pass: Create nodes
+        entries = list(_iter_py_files(self.src_dir, self._prune_dir, self._exclude_walked,
+                                      lambda e: self._debug_print(f"skipping unreadable directory: {e}")))
+        self._prune_cache(entries)
+        if self.parallel_io:
+            self._prescan(entries)
+        if self.parallel_io and len(entries) > 1:
+            from concurrent.futures import ThreadPoolExecutor
+            with ThreadPoolExecutor(max_workers=min(32, len(entries))) as pool:
+                infos = list(pool.map(lambda entry: self.analyze_file(*entry), entries))
+        else:
+            infos = [self.analyze_file(*entry) for entry in entries]
+
+        for (file_path, _), module_info in zip(entries, infos):
+            if module_info is not None:
+                self.modules[file_path] = module_info
+                self._add_node(file_path)
+                self._debug_print(f"Added node: {module_info.rel_posix}")
+                if module_info.imports:
+                    self._debug_print(f"  Found imports: {', '.join(module_info.imports)}")
+        self._save_cache()
+        
+        # Index modules by relative path, and by every trailing run of path
+        # segments for absolute imports, so edges resolve with dict lookups
+        by_rel: Dict[str, Path] = {}
+        by_suffix: Dict[str, List[Path]] = {}
+        for other_path, other in self.modules.items():
+            other_rel = other.rel_posix
+            by_rel[other_rel] = other_path
+            segments = other_rel.split('/')
+            for i in range(len(segments)):
+                by_suffix.setdefault('/'.join(segments[i:]), []).append(other_path)
+
+        # Second pass: Add edges
+        for file_path, module in self.modules.items():
+            current_module = module.rel_posix
+            module_dir = module.parent_posix
+            
+            package_parts = [] if module_dir == '.' else module_dir.split('/')
+            
+            for level, target_module in module.import_targets:
+                if level:
+                    # Handle relative imports: level 1 is this module's own
+                    # package, each further level goes up one directory
+                    if level - 1 > len(package_parts):
+                        continue  # Invalid relative import
+                        
+                    base_parts = package_parts[:len(package_parts) - (level - 1)]
+                    
+                    if target_module:
+                        target_file = f"{target_module.replace('.', '/')}.py"
+                    else:
+                        target_file = "__init__.py"
+                    full_target = '/'.join(base_parts + [target_file])
+                    
+                    # Find matching module
+                    other_path = by_rel.get(full_target)
+                    if other_path is not None:
+                        self._debug_print(f"  Adding edge: {full_target} -> {current_module}")
+                        self._add_edge(file_path, other_path)
+                else:
+                    # Handle absolute imports within our project
+                    potential_path = target_module.replace('.', '/') + '.py'
+                    for other_path in by_suffix.get(potential_path, ()):
+                        self._debug_print(f"  Adding edge: {self.modules[other_path].rel_posix} -> {current_module}")
+                        self._add_edge(file_path, other_path)
+
+        self._graph_built = True
+
+    def _iter_concat_chunks(self):
+        """Yield the combined module source, piece by piece, in dependency order"""
+        self.build_dependency_graph()
+        
+        header = f"""{self._get_header_content()}
+Summary Level: {self.summary_level.value}
+        """
+        
+        # Get files in dependency order
+        sorted_files = self._get_sorted_files()
+        
+        summarizing = self.summary_level is not SummaryLevel.NONE
+        # Files without class/def can skip the default rules entirely
+        needs_defs = summarizing and self._rules_need_defs()
+        
+        # Emit everything in order, starting with external imports
+        yield header
+        # The directory tree and ASCII graph are only rendered as part of a report
+        if self.generate_report:
+            preamble = ('"""', self.generate_dependency_ascii(), "# External imports", '"""')
+        else:
+            preamble = ("# External imports",)
+        for piece in (*preamble, *self._get_external_imports(), "\n# Combined module code\n"):
+            yield '\n'
+            yield piece
+
+        # Module sources are read, processed and emitted one at a time
+        for file_path in sorted_files:
+            module = self.modules.get(file_path)
+            if module is not None:
+                yield f"\n\n# From {module.rel_posix}\n"
+                content = module.read_content()
+                if summarizing and not (needs_defs and 'class' not in content and 'def' not in content):
+                    content = self._summarize_content(content, module.has_relative_imports)
+                elif module.has_relative_imports:
+                    content = self._process_imports(content, file_path)
+                yield content
+
+    def generate_concat_file(self, output_file: str = "colab_combined.py") -> str:
+        """Generate a single file combining all modules in dependency order"""
+        with open(output_file, 'w', encoding='utf-8', buffering=1 << 16) as f:
+            f.writelines(self._iter_concat_chunks())
+            
+        return output_file
+    
+    def _import_partition(self) -> Tuple[Set[str], Set[str]]:
+      """Split every module's imports into (external, internal) in one pass.
+
+      Internal imports are relative ones and absolute ones naming a package
+      or root-level module under src_dir.
+      """
+      if '_import_partition' in self._render_cache:
+          return self._render_cache['_import_partition']
+      # Top-level names our own modules import as: packages and root-level modules
+      internal_prefixes = set()
+      for module in self.modules.values():
+          top = module.rel_posix.split('/', 1)[0]
+          internal_prefixes.add(top[:-3] if top.endswith('.py') else top)
+
+      external_imports = set()
+      internal_imports = set()
+      for module in self.modules.values():
+          for imp in module.imports:
+              if imp.startswith('.') or imp.split(' ', 1)[0].split('.', 1)[0] in internal_prefixes:
+                  internal_imports.add(imp)
+              else:
+                  external_imports.add(imp)
+      partition = self._render_cache['_import_partition'] = (external_imports, internal_imports)
+      return partition
+
+    def _get_external_imports(self) -> List[str]:
+      """Get sorted list of external imports from all modules"""
+      if '_get_external_imports' not in self._render_cache:
+          # Format and sort the import statements
+          self._render_cache['_get_external_imports'] = sorted(
+              f"import {imp}" for imp in self._import_partition()[0])
+      return self._render_cache['_get_external_imports']
+
+    def _paths_match(self, path: Path, import_parts: List[str]) -> bool:
+        """Check if a path matches an import statement"""
+        return path.parts == tuple(import_parts)
+
+    def _csr(self) -> Tuple[List[Path], array, array]:
+        """Freeze the graph into compressed sparse rows: (nodes, indptr, indices).
+
+        Node i's successors are indices[indptr[i]:indptr[i + 1]], as positions
+        in nodes, so the graph algorithms below loop over ints instead of
+        hashing paths. Built once per graph build.
+        """
+        if self._csr_cache is None:
+            nodes = list(self._succ)
+            ids = {node: i for i, node in enumerate(nodes)}
+            indptr = array('i', [0])
+            indices = array('i')
+            for node in nodes:
+                indices.extend(ids[dst] for dst in self._succ[node])
+                indptr.append(len(indices))
+            self._csr_cache = (nodes, indptr, indices)
+        return self._csr_cache
+
+    def _topological_order(self) -> Optional[List[Path]]:
+        """Topologically sorted nodes, or None if the graph has cycles.
+
+        Kahn's algorithm with a FIFO queue, seeded in node order and
+        following edges in insertion order, so ties break the same way on
+        every run. Cached until the graph is rebuilt, so concat output and
+        the report share one sort.
+        """
+        if not self._order_cached:
+            nodes, indptr, indices = self._csr()
+            indegree = [0] * len(nodes)
+            for dst in indices:
+                indegree[dst] += 1
+            order = [i for i, degree in enumerate(indegree) if degree == 0]
+            for i in order:  # grows as nodes become ready
+                for k in range(indptr[i], indptr[i + 1]):
+                    dst = indices[k]
+                    indegree[dst] -= 1
+                    if indegree[dst] == 0:
+                        order.append(dst)
+            # Topological sort ensures dependencies come before dependents
+            self._sorted_cache = [nodes[i] for i in order] if len(order) == len(nodes) else None
+            self._order_cached = True
+        return self._sorted_cache
+
+    def _find_cycles(self) -> List[List[Path]]:
+        """Find one representative cycle per strongly connected component.
+
+        Iterative Tarjan SCC over the CSR arrays; avoids enumerating every
+        elementary cycle. Only run when the topological sort fails, and
+        cached until the graph is rebuilt.
+        """
+        if self._cycles_cache is None:
+            self._cycles_cache = self._tarjan_cycles()
+        return self._cycles_cache
+
+    def _tarjan_cycles(self) -> List[List[Path]]:
+        nodes, indptr, indices = self._csr()
+        index = [-1] * len(nodes)
+        low = [0] * len(nodes)
+        on_stack = [False] * len(nodes)
+        stack: List[int] = []
+        counter = 0
+        cycles = []
+        for root in range(len(nodes)):
+            if index[root] >= 0:
+                continue
+            index[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = True
+            work = [(root, iter(indices[indptr[root]:indptr[root + 1]]))]
+            while work:
+                node, children = work[-1]
+                for child in children:
+                    if index[child] < 0:
+                        index[child] = low[child] = counter
+                        counter += 1
+                        stack.append(child)
+                        on_stack[child] = True
+                        work.append((child, iter(indices[indptr[child]:indptr[child + 1]])))
+                        break
+                    if on_stack[child]:
+                        low[node] = min(low[node], index[child])
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        low[parent] = min(low[parent], low[node])
+                    if low[node] == index[node]:
+                        component = set()
+                        while True:
+                            member = stack.pop()
+                            on_stack[member] = False
+                            component.add(nodes[member])
+                            if member == node:
+                                break
+                        if len(component) > 1 or node in indices[indptr[node]:indptr[node + 1]]:
+                            cycles.append(self._cycle_within(component))
+        return cycles
+
+    def _cycle_within(self, component: Set[Path]) -> List[Path]:
+        """Walk one cycle through a strongly connected component, from its first node"""
+        start = next(node for node in self._succ if node in component)
+        path = [start]
+        seen = {start}
+        work = [iter(self._succ[start])]
+        while work:
+            for child in work[-1]:
+                if child == start:
+                    return path
+                if child in component and child not in seen:
+                    seen.add(child)
+                    path.append(child)
+                    work.append(iter(self._succ[child]))
+                    break
+            else:
+                work.pop()
+                path.pop()
+        return path
+
+    def _get_sorted_files(self) -> List[Path]:
+        """Get files sorted by dependencies"""
+        sorted_files = self._topological_order()
+        if sorted_files is not None:
+            return sorted_files
+
+        # If we detect a cycle, identify and report it
+        cycles = self._find_cycles()
+        self._debug_print("Warning: Circular dependencies detected:")
+        for cycle in cycles:
+            cycle_path = ' -> '.join(p.name for p in cycle)
+            self._debug_print(f"  {cycle_path}")
+        
+        # Fall back to simple ordering but warn user
+        self._debug_print("Using simple ordering instead.")
+        return list(self.modules.keys())
+
+    def visualize_dependencies(self, output_file: Optional[str] = None) -> Optional[str]:
+        """Visualize the dependency graph.
+
+        Returns the ASCII rendering by default; pass a filename to draw it
+        with matplotlib instead (any format savefig knows from the
+        extension, e.g. .png or .svg), returning the filename.
+        """
+        if output_file is not None:
+            return self.visualize_dependencies_png(output_file)
+        return self.visualize_dependencies_ascii()
+
+    def visualize_dependencies_ascii(self) -> str:
+        """ASCII dependency graph with legend, as embedded in reports; needs no matplotlib"""
+        self.build_dependency_graph()
+        return self.generate_dependency_ascii()
+
+    def visualize_dependencies_png(self, output_file: str = "dependencies.png") -> Optional[str]:
+        """Optional: Draw the dependency graph to an image with matplotlib"""
+        self.build_dependency_graph()
+        try:
+            import matplotlib.pyplot as plt
+            import networkx as nx
+            graph = self.dep_graph
+            pos = nx.spring_layout(graph)
+            plt.figure(figsize=(12, 8))
+            nx.draw(graph, pos, with_labels=True, 
+                   labels={p: p.name for p in graph.nodes()},
+                   node_color='lightblue',
+                   node_size=2000,
+                   font_size=8)
+            plt.savefig(output_file)
+            plt.close()
+            return output_file
+        except ImportError:
+            print("matplotlib not available for visualization")
+            return None
+
+    def get_dependency_report(self) -> str:
+        """Generate a detailed dependency report organized in logical sections.
+        
+        Returns a string containing sections in this order:
+        1. Header
+        2. Directory Structure
+        3. Import Summary
+        4. Module Statistics
+        5. PHART Visualization with Legend
+        6. Dependency Chains
+        7. Module Details
+
+        The report is built once per graph build and then returned as is.
+        """
+        self.build_dependency_graph()
+        if 'get_dependency_report' in self._render_cache:
+            return self._render_cache['get_dependency_report']
+
+        out = io.StringIO()
+        write = out.write
+
+        # Header section - introduces the report
+        write("Dependency Analysis Report\n" + "=" * 25 + "\n\n")
+        
+        # Directory tree section - shows file organization
+        write(f"Directory Structure:\n{self._get_tree_output()}\n\n")
+        
+        # Import summary section - external and internal dependencies
+        write(f"Import Summary:\n{self._generate_import_summary()}\n\n")
+        
+        # Module statistics and graph header
+        write("Module Statistics:\n"
+              f"Total modules: {len(self.modules)}\n"
+              f"Total dependencies: {self._edge_count()}\n\n"
+              "Module Dependencies:\n"
+              "-------------------\n\n")
+        
+        # PHART visualization - includes the graph and its legend
+        # Note: generate_dependency_ascii() returns a pre-formatted string
+        write(f"{self.generate_dependency_ascii()}\n\n")
+        
+        # Dependency chains section - shows topological ordering
+        write("Dependency Chains:\n" + "-" * 17 + "\n")
+        rel = {path: module.rel_posix for path, module in self.modules.items()}
+        sorted_files = self._topological_order()
+        if sorted_files is not None:
+            for idx, file in enumerate(sorted_files):
+                deps = self._pred[file]
+                write(f"{idx+1}. {rel[file]}\n")
+                if deps:
+                    write(f" Depends on: {', '.join(rel[d] for d in deps)}\n")
+        else:
+            write("Warning: Circular dependencies detected!\nCycles found:\n")
+            for cycle in self._find_cycles():
+                write(f"  {' -> '.join(rel[p] for p in cycle)}\n")
+        write("\n")
+        
+        # Module details section - detailed information about each module
+        write("Module Details:\n" + "-" * 13)
+        for path, module in self.modules.items():
+            write(f"\n\n{module.rel_posix}:"
+                  f"\nClasses: {', '.join(module.classes) if module.classes else 'None'}"
+                  f"\nFunctions: {', '.join(module.functions) if module.functions else 'None'}"
+                  f"\nImports: {', '.join(module.imports) if module.imports else 'None'}")
+        
+        report = self._render_cache['get_dependency_report'] = out.getvalue()
+        return report
+
+    def _get_header_content(self):
+        return  f"""
+# Generated by ChimeraCat
+#  /\___/\   ChimeraCat
+# ( o   o )  smart code concatenator/summarizer
+# (  =^=  )  ccat {__version__} https://github.com/scottvr/chimeracat
+#  (______)  Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"""
+        
+    def generate_colab_notebook(self, output_file: str = "colab_combined.ipynb", compact: bool = False):
+        """Generate a Jupyter notebook with the combined code.
+
+        Cell sources are single strings rather than lists of lines, which
+        nbformat accepts equally. With compact, the JSON is written without
+        indentation: smaller and faster to write, and Jupyter reads it the same.
+        """
+        code = ''.join(self._iter_concat_chunks())
+        
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S") 
+        notebook = {
+            "cells": [
+                {
+                    "cell_type": "markdown",
+                    "metadata": {},
+                    "source": [
+                        "##Notebook Generated by ChimeraCat\n"
+                    ],
+                },
+                {
+                    "cell_type": "code",
+                    "metadata": {},
+                    "source": code,
+                    "execution_count": None,
+                    "outputs": []
+                },
+                {
+                    "cell_type": "markdown",
+                    "metadata": {},
+                    "source": f"```{self._get_header_content()}\n```\n"
+                }
+
+            ],
+            "metadata": {
+                "kernelspec": {
+                    "display_name": "Python 3",
+                    "language": "python",
+                    "name": "python3"
+                }
+            },
+            "nbformat": 4,
+            "nbformat_minor": 4
+        }
+        
+        import json
+        # Encode in memory and write once; json.dump issues a write per token
+        if compact:
+            text = json.dumps(notebook, ensure_ascii=False, separators=(',', ':'))
+        else:
+            text = json.dumps(notebook, ensure_ascii=False, indent=2)
+        with open(output_file, 'w', encoding='utf-8') as f:
+            f.write(text)
+
+        return output_file
+    
+    def generate_dependency_ascii(self) -> str:
+        """Generate ASCII representation of dependency graph"""
+        if 'generate_dependency_ascii' in self._render_cache:
+            return self._render_cache['generate_dependency_ascii']
+        import networkx as nx
+        from phart import ASCIIRenderer, LayoutOptions, NodeStyle
+        
+        # Mapping of short labels (A, B, ..., AA, AB or 1, 2, ...) to original node names, and back
+        labels = map(str, itertools.count(1)) if self.use_numeric else _alpha_labels()
+        label_mapping = dict(zip(labels, self._succ))
+        node_to_label = {node: label for label, node in label_mapping.items()}
+        
+        nodes, indptr, indices = self._csr()
+        node_labels = [node_to_label[node] for node in nodes]
+        shown = range(len(nodes))
+        if self.elide_disconnected_deps:
+            self._debug_print("removing disconnected imports (no dependent relationship)")
+            # One degree scan: a node is disconnected if it neither imports nor is imported
+            indegree = [0] * len(nodes)
+            for dst in indices:
+                indegree[dst] += 1
+            shown = [i for i in shown if indegree[i] or indptr[i + 1] > indptr[i]]
+            self._debug_print(f"keeping {len(shown)} of {len(nodes)} modules")
+
+        # Build the display graph directly on the labels, without isolated nodes if elided
+        display_graph = nx.DiGraph()
+        display_graph.add_nodes_from(node_labels[i] for i in shown)
+        display_graph.add_edges_from((node_labels[i], node_labels[indices[k]])
+                                     for i in range(len(nodes)) for k in range(indptr[i], indptr[i + 1]))
+#TODO: enable phart cli options from ccat command-line
+        options = LayoutOptions(
+            node_style=NodeStyle.SQUARE,
+            node_spacing=4,
+            layer_spacing=3
+        )
+
+        # Generate the legend
+        legend = "\n".join(["Legend:", *(f"{short_label}: {original_node}"
+                                          for short_label, original_node in label_mapping.items())])
+
+        renderer = ASCIIRenderer(display_graph, options=options)
+        ascii_art = f"""
+Directory Structure:
+--------------------
+{self._get_tree_output()}
+   
+Module Dependencies:
+--------------------
+PHART Module Dependency Graph Visualization (see legend below):
+
+{renderer.render()}
+{legend}
+{"(non-dependent modules elided from visualization)" if self.elide_disconnected_deps else "node names detached from the network and printed in isolation are non-connected/likely unused."}
+
+"""
+        self._render_cache['generate_dependency_ascii'] = ascii_art
+        return ascii_art
+
+    def _get_tree_output(self) -> str:
+        """Get tree command output"""
+        if '_get_tree_output' not in self._render_cache:
+            import shutil
+            output = None
+            if shutil.which('tree'):
+                import subprocess
+                try:
+                    output = subprocess.run(
+                        ['tree', str(self.src_dir)],
+                        capture_output=True,
+                        text=True
+                    ).stdout
+                except OSError:
+                    pass
+            if output is None:
+                # Fallback to a simple listing of the modules already walked
+                self.build_dependency_graph()
+                output = '\n'.join(str(p.relative_to(self.src_dir)) for p in self.modules)
+            self._render_cache['_get_tree_output'] = output
+        return self._render_cache['_get_tree_output']
+    
+    def _generate_import_summary(self) -> str:
+        """Generate summary of imports"""
+        if '_generate_import_summary' in self._render_cache:
+            return self._render_cache['_generate_import_summary']
+        external_imports, internal_deps = self._import_partition()
+        
+        summary = f"""
+    External Dependencies:
+    {', '.join(sorted(external_imports))}
+    
+    Internal Dependencies:
+    {', '.join(sorted(internal_deps))}
+    """
+        self._render_cache['_generate_import_summary'] = summary
+        return summary
+    
+def get_default_filename(summary_level: SummaryLevel, is_notebook: bool = False) -> str:
+    """Get the default base filename based on output type and summary level"""
+    if is_notebook:
+        return "colab_ready"  # Always full code for notebooks
+        
+    summary_level_names = {
+        SummaryLevel.INTERFACE: "signatures_only",
+        SummaryLevel.CORE: "essential_code",
+        SummaryLevel.NONE: "complete_code"
+    }
+    return summary_level_names[summary_level]
+
+def process_cli_args(args: Optional[List[str]] = None) -> dict:
+    """Process command line arguments and return a config dict for ChimeraCat"""
+    parser = create_cli_parser()
+    parsed_args = parser.parse_args(args)
+
+    # Convert summary level string to enum
+    summary_level = getattr(SummaryLevel, parsed_args.summary_level.upper())
+
+    # Build config dict
+    config = {
+        'src_dir': parsed_args.src_dir,
+        'summary_level': summary_level,
+        'exclude_patterns': parsed_args.exclude,
+        'elide_disconnected_deps': parsed_args.elide_disconnected,
+        'generate_report': parsed_args.report,
+        'report_only': parsed_args.report_only,
+        'use_numeric': parsed_args.use_numeric,
+        'debug': parsed_args.debug,
+        'debug_str': parsed_args.debug_prefix if parsed_args.debug else "",
+        'cache_file': not parsed_args.no_cache,
+        'jobs': parsed_args.jobs,
+        'fast_deps': parsed_args.fast_deps
+    }
+
+    return config, parsed_args
+
+def cli_main(args: Optional[List[str]] = None) -> int:
+    """Main CLI entry point for ChimeraCat"""
+    argv = sys.argv[1:] if args is None else args
+    if argv == ['--version']:
+        # Answered without importing argparse or building the parser
+        sys.stdout.write(f"ccat {__version__}\n")
+        return 0
+
+    debug = False
+    try:
+        config, args = process_cli_args(argv)
+        debug = args.debug
+        
+        # Create ChimeraCat instance for Python output (with summarization)
+        cat = ChimeraCat(**config)
+        
+        if args.report_only:
+            cat.build_dependency_graph() 
+            print(cat.get_dependency_report())
+
+        else:
+            # Get base filename from argument or generate default
+            base_filename = args.output
+            
+            if args.output_type in ('py', 'both'):
+                py_filename = f"{base_filename or get_default_filename(config['summary_level'])}.py"
+                py_file = cat.generate_concat_file(py_filename)
+                print(f"Generated Python file: {py_file}")
+                
+            if args.output_type in ('ipynb', 'both'):
+                # Notebook gets the complete code, reusing the scan done above
+                notebook_cat = cat.clone_with(SummaryLevel.NONE, config['generate_report'])
+            
+                nb_filename = f"{base_filename or get_default_filename(summary_level=SummaryLevel.NONE, is_notebook=True)}.ipynb"
+                nb_file = notebook_cat.generate_colab_notebook(nb_filename)
+                print(f"Generated Jupyter notebook (complete code): {nb_file}")
+
+        # If debug is enabled, show additional information regardless of report setting
+        if args.debug or args.report:
+            print(cat.get_dependency_report())
+        
+        return 0
+
+    except Exception as e:
+        print(f"Error: {str(e)}", file=sys.stderr)
+        if debug:
+            import traceback
+            traceback.print_exc()
+        return 1
+
+def _positive_int(value: str) -> int:
+    """argparse type for counts that must be at least 1"""
+    import argparse
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: {value!r}")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+@lru_cache(maxsize=1)
+def create_cli_parser() -> "argparse.ArgumentParser":
+    """Create the command-line argument parser for ChimeraCat.
+
+    The parser is built once per process and shared; parse_args does not modify it.
+    """
+    import argparse
+    parser = argparse.ArgumentParser(
+        prog='ccat',
+        description="""
+    ChimeraCat (ccat) - The smart code concatenator
+     /\\___/\\   
+    ( o   o )  Intelligently combines Python source files
+    (  =^=  )  while maintaining dependencies and readability
+     (______)  
+        """,
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+
+    parser.add_argument(
+        'src_dir',
+        type=str,
+        nargs='?',
+        default='src',
+        help='Source directory containing Python files (default: src)'
+    )
+
+    parser.add_argument(
+        '-s', '--summary-level',
+        type=str,
+        choices=('interface', 'core', 'none'),
+        default='none',
+        help='Code summarization level (for .py output only, default: none)'
+    )
+
+    parser.add_argument(
+        '-e', '--exclude',
+        type=str,
+        nargs='+',
+        help='Patterns to exclude from processing (e.g., "test" "temp" "*_old.py")'
+    )
+
+    parser.add_argument(
+        '-o', '--output',
+        type=str,
+        help='Output file name (without extension, default: based on output type and summary level)'
+    )
+
+    parser.add_argument(
+        '-t', '--output-type',
+        type=str,
+        choices=('py', 'ipynb', 'both'),
+        default='both',
+        help='Output file type (default: both)'
+    )
+
+    parser.add_argument(
+        '-r', '--report',
+        action='store_true',
+        default=None,
+        help='Generate dependency report and ASCII visualization. By default, reports are '
+            'included for interface/core summary levels and excluded for complete code '
+            'and notebooks. This flag overrides that behavior.'
+    )
+
+    parser.add_argument(
+        '--report-only',
+        action='store_true',
+        dest='report_only',
+        help='Suppress code summarization or notebook cocatenization' 
+    )
+    
+    parser.add_argument('--numeric-labels', action='store_true', dest="use_numeric", help='Use numbers instead of letters for node labels')
+    
+    # Add a no-report option for when you want to suppress reports in INTERFACE/CORE
+    parser.add_argument(
+        '--no-report',
+        action='store_false',
+        dest='report',
+        help='Suppress dependency report generation even for interface/core summary levels'
+    )
+
+    parser.add_argument(
+        '--elide-disconnected',
+        action='store_true',
+        help='Remove modules with no dependencies from visualization'
+    )
+
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Do not read or write the per-user analysis cache (~/.cache/chimeracat)'
+    )
+
+    parser.add_argument(
+        '-j', '--jobs',
+        type=_positive_int,
+        metavar='N',
+        help='Worker processes for scanning uncached files (default: one per CPU core; 1 disables)'
+    )
+
+    parser.add_argument(
+        '--fast-deps',
+        action='store_true',
+        help='Find imports and definitions with a quick regex scan instead of parsing (approximate)'
+    )
+
+    parser.add_argument(
+        '-d', '--debug',
+        action='store_true',
+        help='Enable debug output'
+    )
+
+    parser.add_argument(
+        '--debug-prefix',
+        type=str,
+        default='CCAT:',
+        help='Prefix for debug messages (default: CCAT:)'
+    )
+
+    parser.add_argument(
+        '--version',
+        action='version',
+        version=f'%(prog)s {__version__}'
+    )
+
+    return parser
+
+#
+#if __name__ == "__main__":
+#    debug = True
+#    generate_report = None  # None: report for interface/core, not for complete code
+#    # Example with different summary levels for Python output
+#    examples = {
+#        SummaryLevel.INTERFACE: "signatures_only.py",
+#        SummaryLevel.CORE: "essential_code.py",
+#        SummaryLevel.NONE: "complete_code.py",
+#    }
+#    
+#    # Scan src once; each level renders from the shared graph
+#    base = ChimeraCat(
+#        "src", 
+#        exclude_patterns=["tools\\", ".ipynb", "cats\\"], 
+#        debug=debug, 
+#        debug_str="DBG: ", 
+#        elide_disconnected_deps=True,
+#    )
+#    # Each level renders from the shared scan; report lines are written in one go
+#    generated = [base.clone_with(summary_level=level, generate_report=generate_report).generate_concat_file(filename)
+#                 for level, filename in examples.items()]
+#    sys.stdout.write(''.join(f"Generated {level.value} version: {output_file}\n"
+#                             for level, output_file in zip(examples, generated)))
+#    
+#    # Generate notebook with complete code
+#    cat = base.clone_with(summary_level=SummaryLevel.NONE)
+#    output_file = cat.generate_colab_notebook("colab_ready.ipynb")
+#    print(f"Generated notebook version: {output_file}")
+#
+#    if debug:
+#        print(cat.visualize_dependencies())  # or visualize_dependencies("module_deps.png")
+#        print(base.get_dependency_report())
\ No newline at end of file
@@ -0,0 +1,140 @@
+"""Check the persistent per-file analysis cache on a throwaway source tree.
+
+Entries are keyed on path, mtime and size, so tests that need to tell a
+reused entry from a fresh scan plant a marker in the cache file and see
+whether it comes back.
+"""
+import io
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+from unittest import mock
+
+from chimeracat import chimeracat
+from chimeracat.chimeracat import ChimeraCat
+
+
+class CacheTestCase(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+        self.src = self.root / 'src'
+        self.src.mkdir()
+        self.cache_file = self.root / 'cache.json'
+        self.write('a.py', 'import os\n\nclass A:\n    pass\n')
+        # Scans are also memoized per process; start every test cold
+        chimeracat._scan_memo.clear()
+        self.addCleanup(chimeracat._scan_memo.clear)
+
+    def write(self, name: str, text: str) -> Path:
+        path = self.src / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text)
+        return path
+
+    def build(self, **kwargs) -> ChimeraCat:
+        kwargs.setdefault('cache_file', self.cache_file)
+        cat = ChimeraCat(str(self.src), **kwargs)
+        cat.build_dependency_graph()
+        return cat
+
+    def classes(self, cat: ChimeraCat, name: str) -> set:
+        return cat.modules[self.src / name].classes
+
+    def cached_files(self) -> dict:
+        return json.loads(self.cache_file.read_text())['files']
+
+    def plant_class(self, name: str, cls: str):
+        """Add a class to a file's cached entry without touching the file"""
+        data = json.loads(self.cache_file.read_text())
+        data['files'][os.path.abspath(self.src / name)][3].append(cls)
+        self.cache_file.write_text(json.dumps(data))
+        chimeracat._scan_memo.clear()
+
+
+class AnalysisCacheTest(CacheTestCase):
+    def test_scan_is_written_to_cache(self):
+        self.build()
+        entry = self.cached_files()[os.path.abspath(self.src / 'a.py')]
+        self.assertEqual(entry[2:5], [['os'], ['A'], []])
+
+    def test_unchanged_file_is_not_rescanned(self):
+        self.build()
+        self.plant_class('a.py', 'Planted')
+        self.assertEqual(self.classes(self.build(), 'a.py'), {'A', 'Planted'})
+
+    def test_mtime_change_rescans(self):
+        path = self.src / 'a.py'
+        self.build()
+        self.plant_class('a.py', 'Planted')
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        self.assertEqual(self.classes(self.build(), 'a.py'), {'A'})
+
+    def test_size_change_rescans(self):
+        path = self.src / 'a.py'
+        self.build()
+        stat = path.stat()
+        self.write('a.py', 'import os\n\nclass B:\n    pass\n\nclass C:\n    pass\n')
+        # Same mtime, so only the size tells the entry is stale
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        self.assertEqual(self.classes(self.build(), 'a.py'), {'B', 'C'})
+
+    def test_no_cache_file_disables_cache(self):
+        self.build()
+        self.plant_class('a.py', 'Planted')
+        self.assertEqual(self.classes(self.build(cache_file=None), 'a.py'), {'A'})
+
+    def test_cli_no_cache_writes_nothing(self):
+        cache_dir = self.root / 'user-cache'
+        with mock.patch.object(chimeracat, 'DEFAULT_CACHE_DIR', cache_dir), redirect_stdout(io.StringIO()):
+            self.assertEqual(chimeracat.cli_main(['--no-cache', '--report-only', str(self.src)]), 0)
+            self.assertFalse(cache_dir.exists())
+            self.assertEqual(chimeracat.cli_main(['--report-only', str(self.src)]), 0)
+            self.assertEqual(list(cache_dir.iterdir()), [chimeracat.default_cache_file(self.src)])
+
+
+class CacheFileTest(CacheTestCase):
+    def test_default_cache_file_is_per_src_dir(self):
+        other = self.root / 'other'
+        other.mkdir()
+        with mock.patch.object(chimeracat, 'DEFAULT_CACHE_DIR', self.root / 'user-cache'):
+            cache_file = ChimeraCat(str(self.src)).cache_file
+            self.assertEqual(cache_file.parent, self.root / 'user-cache')
+            self.assertEqual(ChimeraCat(str(self.src / '..' / 'src')).cache_file, cache_file)
+            self.assertNotEqual(ChimeraCat(str(other)).cache_file, cache_file)
+
+    def test_deleted_files_are_pruned(self):
+        outside = os.path.abspath(self.root / 'elsewhere.py')
+        self.write('b.py', 'import a\n')
+        self.build()
+        data = json.loads(self.cache_file.read_text())
+        data['files'][outside] = data['files'][os.path.abspath(self.src / 'b.py')]
+        self.cache_file.write_text(json.dumps(data))
+        (self.src / 'b.py').unlink()
+        self.build()
+        # Entries outside src_dir may belong to another tree sharing the file
+        self.assertEqual(set(self.cached_files()), {os.path.abspath(self.src / 'a.py'), outside})
+
+    def test_unreadable_cache_is_ignored_and_replaced(self):
+        self.cache_file.write_text('{not json')
+        self.assertEqual(self.classes(self.build(), 'a.py'), {'A'})
+        self.assertEqual(list(self.cached_files()), [os.path.abspath(self.src / 'a.py')])
+
+    def test_malformed_entries_are_dropped(self):
+        self.build()
+        data = json.loads(self.cache_file.read_text())
+        # Current mtime and size, so only the shape check can reject it
+        data['files'][os.path.abspath(self.src / 'a.py')][2] = 5
+        self.cache_file.write_text(json.dumps(data))
+        chimeracat._scan_memo.clear()
+        self.assertEqual(self.classes(self.build(), 'a.py'), {'A'})
+        self.assertEqual(self.cached_files()[os.path.abspath(self.src / 'a.py')][3], ['A'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+"""Check dependency edges resolved from a small package tree on disk."""
+import tempfile
+import unittest
+from pathlib import Path
+
+from chimeracat.chimeracat import ChimeraCat, SummaryLevel
+
+TREE = {
+    'b.py': '',
+    'ab.py': '',
+    'score.py': '',
+    'main.py': 'import b\nimport pkg.core\n',
+    'pkg/__init__.py': '',
+    'pkg/core.py': 'from .util import helper\n',
+    'pkg/util.py': 'import core\n',
+    'pkg/sub/__init__.py': '',
+    # The last import climbs above src_dir and resolves to nothing
+    'pkg/sub/deep.py': 'from ..core import C\nfrom . import x\nfrom .... import nothing\n',
+}
+
+
+class GraphTestCase(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.src = Path(tmp.name)
+        for name, text in TREE.items():
+            self.write(name, text)
+
+    def write(self, name: str, text: str):
+        path = self.src / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text)
+
+    def build(self, **kwargs) -> ChimeraCat:
+        cat = ChimeraCat(str(self.src), cache_file=None, **kwargs)
+        cat.build_dependency_graph()
+        return cat
+
+    @staticmethod
+    def edges(cat: ChimeraCat) -> set:
+        """(importer, imported) pairs as paths relative to src_dir"""
+        rel = lambda path: cat.modules[path].rel_posix
+        return {(rel(src), rel(dst)) for src, dsts in cat._succ.items() for dst in dsts}
+
+
+class ImportResolutionTest(GraphTestCase):
+    def test_relative_imports(self):
+        edges = self.edges(self.build())
+        self.assertIn(('pkg/core.py', 'pkg/util.py'), edges)
+        self.assertIn(('pkg/sub/deep.py', 'pkg/core.py'), edges)
+        self.assertIn(('pkg/sub/deep.py', 'pkg/sub/__init__.py'), edges)
+        self.assertEqual({dst for src, dst in edges if src == 'pkg/sub/deep.py'},
+                         {'pkg/core.py', 'pkg/sub/__init__.py'})
+
+    def test_absolute_imports_match_whole_segments(self):
+        edges = self.edges(self.build())
+        self.assertEqual({dst for src, dst in edges if src == 'main.py'}, {'b.py', 'pkg/core.py'})
+        # "import core" is a suffix of pkg/core.py, but only a substring of score.py
+        self.assertEqual({dst for src, dst in edges if src == 'pkg/util.py'}, {'pkg/core.py'})
+
+    def test_fast_deps_resolves_the_same_edges(self):
+        self.assertEqual(self.edges(self.build(fast_deps=True)), self.edges(self.build()))
+
+
+class CloneWithTest(GraphTestCase):
+    def test_clone_shares_the_scan(self):
+        cat = self.build()
+        clone = cat.clone_with(SummaryLevel.CORE)
+        self.assertIs(clone.modules, cat.modules)
+        self.assertIs(clone._succ, cat._succ)
+        self.assertEqual(clone.summary_level, SummaryLevel.CORE)
+        self.assertEqual(cat.summary_level, SummaryLevel.NONE)
+
+    def test_forced_rebuild_of_clone_leaves_original_alone(self):
+        cat = self.build()
+        edges = self.edges(cat)
+        clone = cat.clone_with(SummaryLevel.INTERFACE)
+        self.write('extra.py', 'import b\n')
+        clone.build_dependency_graph(force=True)
+        self.assertIn(('extra.py', 'b.py'), self.edges(clone))
+        self.assertNotIn(self.src / 'extra.py', cat.modules)
+        self.assertEqual(self.edges(cat), edges)
+
+
+if __name__ == '__main__':
+    unittest.main()
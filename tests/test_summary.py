@@ -0,0 +1,101 @@
+"""Pin the output of the single-pass summarizer for the default rules.
+
+The combined pattern matches each stretch of source at most once, with the
+first matching alternative winning (core rules before interface ones). That
+differs from applying the rules one after another, so these cases keep the
+chosen behaviour from drifting.
+"""
+import unittest
+
+from chimeracat.chimeracat import ChimeraCat, SummaryLevel, SummaryPattern, SummaryRules
+
+# Trimmed from the stdlib's abc.py: class text inside a docstring. The
+# sequential passes let the function rule swallow the second def.
+DOCSTRING_WITH_CLASS = '''def abstractmethod(funcobj):
+    """A decorator indicating abstract methods.
+        class C(metaclass=ABCMeta):
+            """Clear the caches (for debugging or testing)."""
+def update_abstractmethods(cls):
+    """Recalculate the set of abstract methods of an abstract class.
+'''
+
+MODULE = '''import os
+
+def get_name(self): return self.name
+
+def __init__(self, x):
+    self.x = x
+
+def area(self):
+    return self.w * self.h
+'''
+
+
+def summarize(source: str, level: SummaryLevel, rules: SummaryRules = None) -> str:
+    return ChimeraCat(cache_file=None, summary_level=level, rules=rules)._summarize_content(source)
+
+
+class CombinedSummaryTest(unittest.TestCase):
+    def test_each_definition_is_summarized_once(self):
+        self.assertEqual(
+            summarize(DOCSTRING_WITH_CLASS, SummaryLevel.INTERFACE),
+            'def abstractmethod(funcobj):\n'
+            '    ... #  # Function signature preserved\n'
+            '\n'
+            'def update_abstractmethods(cls):\n'
+            '    ... #  # Function signature preserved\n')
+
+    def test_core_rules_win_at_core(self):
+        core = summarize(MODULE, SummaryLevel.CORE)
+        self.assertEqual(
+            core,
+            'import os\n'
+            '\n'
+            'def get_name(self):\n'
+            '    ... #  # Getter method summarized\n'
+            '\n'
+            'def __init__(self, x):\n'
+            '    ... #  # Standard initialization summarized\n'
+            '\n'
+            'def area(self):\n'
+            '    ... #  # Function signature preserved\n')
+        self.assertNotEqual(core, summarize(MODULE, SummaryLevel.INTERFACE))
+
+    def test_interface_level_ignores_core_rules(self):
+        self.assertNotIn('Getter method summarized', summarize(MODULE, SummaryLevel.INTERFACE))
+
+    def test_sequential_rules_run_one_pass_per_pattern(self):
+        rules = SummaryRules.default_rules()
+        rules.sequential = True
+        # The function pass claims the getter first; __init__ is then re-matched
+        self.assertEqual(
+            summarize(MODULE, SummaryLevel.CORE, rules),
+            'import os\n'
+            '\n'
+            'def get_name(self):\n'
+            '    ... #  # Function signature preserved\n'
+            '\n'
+            'def __init__(self, x):\n'
+            '    ... #  # Standard initialization summarized\n'
+            '\n'
+            'def area(self):\n'
+            '    ... #  # Function signature preserved\n')
+
+    def test_level_and_rules_changes_are_picked_up(self):
+        core_def = SummaryPattern(r'(def\s+\w+\([^)]*\)):[^\n]*(?:\n(?!def)[^\n]*)*', r'\1:\n    ...', 'core def')
+        cat = ChimeraCat(cache_file=None, summary_level=SummaryLevel.INTERFACE,
+                         rules=SummaryRules(core=[core_def]))
+        source = 'def f(x):\n    return x\n'
+        self.assertEqual(cat._summarize_content(source), source)
+        cat.summary_level = SummaryLevel.CORE
+        self.assertEqual(cat._summarize_content(source), 'def f(x):\n    ... # core def\n')
+        cat.rules = SummaryRules.default_rules()
+        self.assertEqual(cat._summarize_content(source),
+                         'def f(x):\n    ... #  # Function signature preserved\n')
+
+    def test_none_level_leaves_source_alone(self):
+        self.assertEqual(summarize(MODULE, SummaryLevel.NONE), MODULE)
+
+
+if __name__ == '__main__':
+    unittest.main()